@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 from src.llm.ollama_client import OllamaClient
 from src.agents.planner import Plan
 from src.agents.schema_context import SCHEMA
@@ -78,7 +78,49 @@ def _format_program_requirements(rows: List[Dict[str, Any]]) -> str:
     return "\n\n".join(parts).strip()
 
 
-def answer(llm: OllamaClient, plan: Plan, question: str, rows: List[Dict[str, Any]]) -> str:
+def _format_degree_plan(
+    rows: List[Dict[str, Any]],
+    electives: Sequence[str] = (),
+    cycle: Sequence[str] = (),
+    blocked: Sequence[str] = (),
+) -> str:
+    # rows like: [{"term":1,"code":"CSE116","title":"...","credits":4,"requirement_type":"Core","critical":true}, ...]
+    terms: Dict[int, List[Dict[str, Any]]] = {}
+    for r in rows:
+        if r.get("code") and r.get("term"):
+            terms.setdefault(r["term"], []).append(r)
+    parts = []
+    for term in sorted(terms):
+        items = terms[term]
+        credits = sum(int(r.get("credits") or 0) for r in items)
+        lines = [f"**Term {term}** ({credits} credits)"]
+        for r in items:
+            line = f"- {r['code']}" + (f": {r['title']}" if r.get("title") else "")
+            line += f" ({r.get('credits', '?')} cr, {r.get('requirement_type') or 'Required'})"
+            if r.get("critical"):
+                line += " *"
+            lines.append(line)
+        parts.append("\n".join(lines))
+    critical = [r["code"] for r in sorted(rows, key=lambda r: r.get("term") or 0) if r.get("critical")]
+    if critical:
+        parts.append(f"Critical path: {len(critical)} terms (" + " \u2192 ".join(critical) + ") — marked *")
+    if electives:
+        parts.append("Electives still to choose (not scheduled): " + ", ".join(electives))
+    if cycle:
+        parts.append("Could not be scheduled (prerequisite cycle in the graph): " + ", ".join(cycle))
+    if blocked:
+        parts.append("Could not be scheduled (depends on a course in that cycle): " + ", ".join(blocked))
+    return "\n\n".join(parts)
+
+
+def answer(
+    llm: OllamaClient,
+    plan: Plan,
+    question: str,
+    rows: List[Dict[str, Any]],
+    meta: Optional[Dict[str, Any]] = None,
+) -> str:
+    # meta: degree_plan schedule details beyond the rows ("electives", "cycle", "blocked")
     intent = (plan.intent or "unknown").strip()
 
     # ---------- Deterministic (non-LLM) answers for reliability ----------
@@ -137,6 +179,52 @@ def answer(llm: OllamaClient, plan: Plan, question: str, rows: List[Dict[str, An
         pretty = " \u2192 ".join(ordered) if ordered else " \u2192 ".join(codes)
         return f"Shortest prerequisite path:\n{pretty}"
 
+    if intent == "topic_search":
+        # rows like: {"code","title","department","level","score"}, best match first
+        if not rows:
+            return "I couldn't find any courses covering that topic in the graph."
+        topic = plan.topic or question
+        lines = [f"- {r['code']}" + (f": {r['title']}" if r.get("title") else "") for r in rows if r.get("code")]
+        return f"Courses matching \"{topic}\" (best match first):\n" + "\n".join(lines)
+
+    if intent == "eligible_courses":
+        # rows like: {"code","title","department","requirement_type"}
+        if not rows:
+            return "I couldn't find any courses you are eligible for yet in the graph."
+        # Group by requirement type when filtered to a program, otherwise by department
+        key = "requirement_type" if any(r.get("requirement_type") for r in rows) else "department"
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            groups.setdefault(r.get(key) or "Other", []).append(r)
+        parts = [f"**{g}:**\n" + _format_course_list(items) for g, items in sorted(groups.items())]
+        return "Courses you can take now (all direct prerequisites completed):\n\n" + "\n\n".join(parts)
+
+    if intent == "degree_plan":
+        meta = meta or {}
+        electives = meta.get("electives") or []
+        cycle = meta.get("cycle") or []
+        blocked = meta.get("blocked") or []
+        if meta.get("required_courses") == 0:
+            return "That program has no course requirements recorded in the graph."
+        if not rows:
+            if not electives and not cycle and not blocked:
+                return "Nothing left to schedule: every required course for that program is already completed."
+            return "No required courses left to schedule for that program.\n\n" + _format_degree_plan(rows, electives, cycle, blocked)
+        # The schedule is computed deterministically; the LLM only rephrases it
+        schedule = _format_degree_plan(rows, electives, cycle, blocked)
+        user = (
+            f"Question: {question}\n"
+            f"Term-by-term plan computed from the graph (authoritative):\n{schedule}\n\n"
+            "Present this plan to the student in natural language. "
+            "Keep every term number and course code exactly as given; do not add or move courses."
+        )
+        phrased = llm.chat(SYSTEM, user, temperature=0.2)
+        # Fall back to the raw schedule if the phrasing dropped any course
+        codes = [r["code"] for r in rows if r.get("code")] + list(electives) + list(cycle) + list(blocked)
+        if all(c in phrased for c in codes):
+            return phrased
+        return schedule
+
     # ---------- LLM fallback for unknown or complex intents ----------
     if not rows:
         return "I couldn't find that in the graph."
@@ -28,10 +28,12 @@ LIMIT 200
         "param_map": lambda plan: {"code": (plan.course_codes[0] if plan.course_codes else plan.target_course)},
     },
     # ✅ Correct for: "What do I need before I can take X?"
+    # hops = distance of the closest chain, so a follow-up for the direct (1-hop) prereqs
+    # can be answered from these rows without another query
     "all_prereqs": {
         "cypher": """
-MATCH (pre:Course)-[:PREREQUISITE*1..10]->(c:Course {course_code:$code})
-RETURN DISTINCT pre.course_code AS code, pre.title AS title
+MATCH p=(pre:Course)-[:PREREQUISITE*1..10]->(c:Course {course_code:$code})
+RETURN pre.course_code AS code, pre.title AS title, min(length(p)) AS hops
 ORDER BY code
 LIMIT 500
 """.strip(),
@@ -107,11 +109,11 @@ def _fill_template(plan: Plan, intent: str) -> CypherOut:
     return CypherOut(cypher=t["cypher"], params=params)
 
 
-def _safe_json_loads(s: str) -> Dict[str, Any]:
-    try:
-        return json.loads(s)
-    except Exception:
-        return {}
+def _parse_cypher_json(raw: str) -> Dict[str, Any]:
+    data = json.loads(raw)
+    if not isinstance(data, dict) or not isinstance(data.get("cypher"), str) or not data["cypher"].strip():
+        raise ValueError("missing cypher")
+    return data
 
 
 def build_cypher(llm: OllamaClient, plan: Plan, question: str, hint: str = "") -> CypherOut:
@@ -130,8 +132,11 @@ def build_cypher(llm: OllamaClient, plan: Plan, question: str, hint: str = "") -
         {"question": question, "plan": plan.model_dump(), "verifier_hint": hint},
         ensure_ascii=False,
     )
-    raw = llm.chat(SYSTEM, user, temperature=0.0, json_only=True)
-    data = _safe_json_loads(raw)
+    try:
+        # A small cypher model that returns no usable query escalates to the larger one
+        data = llm.chat_json(SYSTEM, user, _parse_cypher_json, temperature=0.0)
+    except ValueError:
+        data = {}
 
     cypher = data.get("cypher") or "MATCH (c:Course) RETURN c LIMIT 1"
     params = data.get("params") or {}
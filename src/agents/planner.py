@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List, Literal, Optional
 from src.llm.ollama_client import OllamaClient
 from src.agents.schema_context import SCHEMA
+from src.rag.entity_index import EntityIndex
 
 Intent = Literal[
     "course_details",
@@ -12,6 +13,9 @@ Intent = Literal[
     "program_requirements",
     "eligibility_check",
     "next_courses",
+    "topic_search",
+    "degree_plan",
+    "eligible_courses",
     "unknown"
 ]
 
@@ -28,19 +32,31 @@ class Plan(BaseModel):
     # new fields for eligibility checks
     target_course: Optional[str] = None
     completed_courses: List[str] = []
+    # topic_search: what to search for, plus optional filters
+    topic: Optional[str] = None
+    department: Optional[str] = None
+    level: Optional[str] = None
+    # degree_plan: per-term credit cap (default 15), and whether to schedule electives too
+    max_credits: Optional[int] = None
+    include_electives: bool = False
 
 SYSTEM = f"""
 You are a planner for a Neo4j graph QA assistant.
 
 Return ONLY JSON matching:
 {{
-  "intent": "course_details|direct_prereqs|all_prereqs|prereq_path|program_requirements|eligibility_check|next_courses|unknown",
+  "intent": "course_details|direct_prereqs|all_prereqs|prereq_path|program_requirements|eligibility_check|next_courses|topic_search|degree_plan|eligible_courses|unknown",
   "course_codes": ["..."],
   "program_ids": ["..."],
   "need_multihop": true/false,
   "notes": "short",
   "target_course": "COURSECODE or null",
-  "completed_courses": ["COURSECODE", ...]
+  "completed_courses": ["COURSECODE", ...],
+  "topic": "search words or null",
+  "department": "CSE|DMS|MTH or null",
+  "level": "UG|GR or null",
+  "max_credits": 15 or null,
+  "include_electives": true/false
 }}
 
 CRITICAL INTENT ROUTING (follow exactly):
@@ -64,6 +80,25 @@ CRITICAL INTENT ROUTING (follow exactly):
   => intent = "eligibility_check"
      target_course = X, completed_courses = [Y, Z]
 
+- If user asks about a SUBJECT rather than a specific course:
+  - "Which courses cover reinforcement learning?"
+  - "Are there any graduate classes on graph databases?"
+  => intent = "topic_search"
+     topic = the subject words, optional department/level/program_ids filters
+
+- If user asks:
+  - "Plan my semesters for BSCS given I've done CSE115"
+  - "How do I finish the MS in Data Science? Max 9 credits per term"
+  => intent = "degree_plan"
+     program_ids = [program], completed_courses = [...], max_credits = cap if stated,
+     include_electives = true only if they ask to plan/include electives too
+
+- If user asks WHICH courses they can take now (no specific target course):
+  - "What can I take now? I've done CSE115 and MTH101"
+  - "Which BSCS courses am I eligible for after CSE116?"
+  => intent = "eligible_courses"
+     completed_courses = [...], program_ids = [program] only if one is named
+
 Examples:
 Q: "What do I need before I can take DMS440?"
 A: {{"intent":"all_prereqs","course_codes":["DMS440"],"program_ids":[],"need_multihop":true,"notes":"Return all prerequisites (closure).","target_course":"DMS440","completed_courses":[]}}
@@ -71,7 +106,12 @@ A: {{"intent":"all_prereqs","course_codes":["DMS440"],"program_ids":[],"need_mul
 Q: "Show the shortest prerequisite chain to DMS440"
 A: {{"intent":"prereq_path","course_codes":["DMS440"],"program_ids":[],"need_multihop":true,"notes":"Return shortest chain.","target_course":"DMS440","completed_courses":[]}}
 
+Q: "Which graduate courses cover deep learning?"
+A: {{"intent":"topic_search","course_codes":[],"program_ids":[],"need_multihop":false,"notes":"Search course descriptions.","target_course":null,"completed_courses":[],"topic":"deep learning","department":null,"level":"GR"}}
+
 Use regex candidates provided in the user message to fill course_codes/program_ids.
+Candidates also include catalog matches for course titles and program names
+(e.g. "Linear Algebra" -> MTH201); always output codes/ids, never titles.
 
 {SCHEMA}
 """
@@ -82,11 +122,28 @@ def _regex_extract(question: str):
     progs = list(dict.fromkeys(PROG_RE.findall(question.upper())))
     return courses, progs
 
-def make_plan(llm: OllamaClient, question: str) -> Plan:
-    # Provide regex candidates to improve reliability
+def extract_entities(question: str, index: Optional[EntityIndex] = None):
     courses, progs = _regex_extract(question)
-    user = json.dumps({"question": question, "regex_course_codes": courses, "regex_program_ids": progs})
-    raw = llm.chat(SYSTEM, user, temperature=0.0, json_only=True)
+    if index is not None:
+        # Titles / program names ("Linear Algebra", "MS in Data Science") via the catalog index
+        idx_courses, idx_progs = index.extract(question)
+        courses = list(dict.fromkeys(courses + idx_courses))
+        progs = list(dict.fromkeys(progs + idx_progs))
+    return courses, progs
+
+def _ground_plan(plan: Plan, index: EntityIndex, courses: List[str], progs: List[str]) -> Plan:
+    # LLMs sometimes echo a title instead of a code; map everything back to catalog ids
+    def canon(kind: str, items: List[str]) -> List[str]:
+        return list(dict.fromkeys(index.canonical(kind, x) or x for x in items if x))
+
+    plan.course_codes = canon("course", plan.course_codes) or courses
+    plan.program_ids = canon("program", plan.program_ids) or progs
+    plan.completed_courses = canon("course", plan.completed_courses)
+    if plan.target_course:
+        plan.target_course = index.canonical("course", plan.target_course) or plan.target_course
+    return plan
+
+def _parse_plan(raw: str) -> Plan:
     data = json.loads(raw)
 
     # ---- Robust defaults (LLMs sometimes output null) ----
@@ -103,3 +160,12 @@ def make_plan(llm: OllamaClient, question: str) -> Plan:
 
     return Plan(**data)
 
+def make_plan(llm: OllamaClient, question: str, index: Optional[EntityIndex] = None) -> Plan:
+    # Provide regex (+ catalog index) candidates to improve reliability
+    courses, progs = extract_entities(question, index)
+    user = json.dumps({"question": question, "regex_course_codes": courses, "regex_program_ids": progs})
+    # Invalid JSON / schema from a small planner model escalates to the larger one
+    plan = llm.chat_json(SYSTEM, user, _parse_plan, temperature=0.0)
+    if index is not None:
+        plan = _ground_plan(plan, index, courses, progs)
+    return plan
@@ -49,15 +49,20 @@ def _safe_verify_dict(d: Dict[str, Any]) -> Dict[str, Any]:
         hint = ""
     return {"verdict": verdict, "reason": reason, "followup_cypher_hint": hint}
 
+def _parse_verify(raw: str) -> VerifyOut:
+    data = json.loads(raw)
+    # A missing/invalid verdict counts as a validation failure (triggers escalation);
+    # missing reason/hint are just defaulted.
+    if not isinstance(data, dict) or data.get("verdict") not in ("pass", "needs_more", "fail"):
+        raise ValueError("missing or invalid verdict")
+    return VerifyOut(**_safe_verify_dict(data))
+
 def verify(llm: OllamaClient, question: str, rows: List[Dict[str, Any]], answer_text: str) -> VerifyOut:
     user = json.dumps({"question": question, "rows": rows, "answer": answer_text}, ensure_ascii=False)
-    raw = llm.chat(SYSTEM, user, temperature=0.0, json_only=True)
 
     # raw might be invalid / wrong-schema; never crash the app
     try:
-        data = json.loads(raw)
-        data = _safe_verify_dict(data)
-        return VerifyOut(**data)
-    except Exception:
+        return llm.chat_json(SYSTEM, user, _parse_verify, temperature=0.0)
+    except ValueError:
         # Ultimate fallback if model returns garbage
         return VerifyOut(verdict="pass", reason="Verifier output was malformed; defaulted to pass.", followup_cypher_hint="")
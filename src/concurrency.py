@@ -0,0 +1,165 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AdmissionRejected(RuntimeError):
+    pass
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters", "listeners", "events")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        self.listeners: List[Callable[..., None]] = []
+        self.events: List[Tuple[Any, ...]] = []
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller (leader) runs `fn`; callers arriving while it is in flight block and
+    receive the same result (or exception). Nothing is cached once the call completes.
+
+    Progress events the leader publishes with `notify(key, ...)` reach every caller's
+    `listener`, and late joiners get the earlier ones replayed first. Listeners run under
+    the flight's lock, so they must be cheap (e.g. append to a list).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T], listener: Optional[Callable[..., None]] = None) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+            if listener is not None:
+                for event in call.events:
+                    listener(*event)
+                call.listeners.append(listener)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def notify(self, key: Hashable, *event: Any) -> None:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                return
+            call.events.append(event)
+            for listener in call.listeners:
+                listener(*event)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class AdmissionQueue:
+    """
+    Caps concurrent work (e.g. LLM calls to one Ollama host) behind a bounded wait queue.
+
+    `max_waiting` callers may queue for a slot; beyond that, or after `timeout` seconds of
+    waiting, `slot()` raises AdmissionRejected instead of piling more load on the server.
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._sem = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.queued = 0  # admitted after waiting in the queue
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        # A free slot is taken at once; only callers that find none queue (and are counted/timed)
+        if self._sem.acquire(blocking=False):
+            with self._lock:
+                self.active += 1
+                self.admitted += 1
+        else:
+            self._wait_for_slot()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._sem.release()
+
+    def _wait_for_slot(self) -> None:
+        with self._lock:
+            if self.max_waiting is not None and self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise AdmissionRejected(f"admission queue full ({self.waiting} waiting)")
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+        start = time.perf_counter()
+        acquired = self._sem.acquire(timeout=self.timeout) if self.timeout is not None else self._sem.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+            else:
+                self.active += 1
+                self.admitted += 1
+                self.queued += 1
+                self.total_wait_s += waited
+                self.max_wait_s = max(self.max_wait_s, waited)
+        if not acquired:
+            raise AdmissionRejected(f"no slot after waiting {waited:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "peak_queue_depth": self.peak_waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "queued": self.queued,
+                "avg_wait_s": round(self.total_wait_s / self.queued, 4) if self.queued else 0.0,
+                "max_wait_s": round(self.max_wait_s, 4),
+            }
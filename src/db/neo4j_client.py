@@ -1,6 +1,12 @@
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
 from typing import Any, Dict, List, Optional
 
+from src.concurrency import SingleFlight
+
 READ_ONLY_PREFIXES = ("MATCH", "WITH", "RETURN", "UNWIND")
 
 def _is_read_only_cypher(query: str) -> bool:
@@ -14,6 +20,8 @@ def _is_read_only_cypher(query: str) -> bool:
 class Neo4jClient:
     def __init__(self, uri: str, user: str, password: str):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        # Identical Cypher+params already in flight share one result
+        self.flight = SingleFlight()
 
     def close(self):
         self.driver.close()
@@ -22,9 +30,43 @@ class Neo4jClient:
         if not _is_read_only_cypher(query):
             raise ValueError("Blocked non-read-only Cypher for safety.")
         params = params or {}
+
+        def run() -> List[Dict[str, Any]]:
+            with self.driver.session() as session:
+                res = session.run(query, params)
+                return [r.data() for r in res]
+
+        key = (query, json.dumps(params, sort_keys=True, default=str))
+        return self.flight.do(key, run)
+
+    def verify_connectivity(self) -> None:
+        self.driver.verify_connectivity()
+
+    def prefill_pool(self, size: int = 4, timeout: float = 10.0) -> int:
+        # Hold `size` sessions open at the same time so the driver opens that many connections
+        barrier = threading.Barrier(size, timeout=timeout)
+
+        def hold():
+            with self.driver.session() as session:
+                session.run("RETURN 1").consume()
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError:
+                    pass
+
+        with ThreadPoolExecutor(max_workers=size) as ex:
+            list(ex.map(lambda _: hold(), range(size)))
+        return size
+
+    def explain(self, query: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Plan a read query without running it (populates Neo4j's query-plan cache)."""
+        if not _is_read_only_cypher(query):
+            raise ValueError("Blocked non-read-only Cypher for safety.")
+        if params is None:
+            # Placeholder values only need the right type for planning
+            params = {name: "" for name in re.findall(r"\$(\w+)", query)}
         with self.driver.session() as session:
-            res = session.run(query, params)
-            return [r.data() for r in res]
+            session.run("EXPLAIN " + query.strip(), params).consume()
 
     def run_write(self, query: str, params: Optional[Dict[str, Any]] = None) -> None:
         params = params or {}
@@ -2,6 +2,8 @@ import csv
 import os
 from dotenv import load_dotenv
 from src.db.neo4j_client import Neo4jClient
+from src.rag.catalog import catalog_fingerprint, load_catalog
+from src.rag.snapshot import DEFAULT_PATH, write_snapshot
 
 load_dotenv()
 
@@ -72,6 +74,11 @@ def main():
     """)
     print(counts[0])
 
+    # Compact mmap-able snapshot so app processes can start without re-querying the graph
+    snapshot_path = os.environ.get("CATALOG_SNAPSHOT", DEFAULT_PATH)
+    info = write_snapshot(snapshot_path, load_catalog(neo), catalog_fingerprint(neo))
+    print(f"Catalog snapshot written to {snapshot_path}: {info}")
+
     neo.close()
 
 if __name__ == "__main__":
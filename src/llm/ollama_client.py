@@ -1,16 +1,84 @@
 import json
+import threading
+import time
 import urllib.request
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.concurrency import AdmissionQueue, SingleFlight
+
+T = TypeVar("T")
+
+
+class ModelStats:
+    """Per-model latency and per-agent escalation counters (shared by all clients of a router)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.models: Dict[str, Dict[str, float]] = {}
+        self.agents: Dict[str, Dict[str, int]] = {}
+
+    def record_call(self, model: str, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            m = self.models.setdefault(model, {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+            m["calls"] += 1
+            if not ok:
+                m["errors"] += 1
+            m["total_s"] += seconds
+            m["max_s"] = max(m["max_s"], seconds)
+
+    def record_json_call(self, agent: str, escalated: bool) -> None:
+        with self._lock:
+            a = self.agents.setdefault(agent, {"json_calls": 0, "escalations": 0})
+            a["json_calls"] += 1
+            if escalated:
+                a["escalations"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for name, m in self.models.items():
+                models[name] = dict(m, avg_s=(m["total_s"] / m["calls"]) if m["calls"] else 0.0)
+            agents = {}
+            for name, a in self.agents.items():
+                rate = (a["escalations"] / a["json_calls"]) if a["json_calls"] else 0.0
+                agents[name] = dict(a, escalation_rate=rate)
+            return {"models": models, "agents": agents}
+
 
 class OllamaClient:
-    def __init__(self, base_url: str, model: str):
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        escalation_model: Optional[str] = None,
+        agent: str = "default",
+        stats: Optional[ModelStats] = None,
+        flight: Optional[SingleFlight] = None,
+        admission: Optional[AdmissionQueue] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.model = model
+        # Larger model retried when the primary model's JSON fails validation
+        self.escalation_model = escalation_model if escalation_model and escalation_model != model else None
+        self.agent = agent
+        self.stats = stats or ModelStats()
+        # Shared by a router's clients: identical prompts in flight run once, and
+        # at most admission.max_concurrent requests hit the Ollama host at a time
+        self.flight = flight
+        self.admission = admission
 
-    def chat(self, system: str, user: str, temperature: float = 0.1, json_only: bool = False) -> str:
+    def chat(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.1,
+        json_only: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        model = model or self.model
         url = f"{self.base_url}/api/chat"
         payload: Dict[str, Any] = {
-            "model": self.model,
+            "model": model,
             "messages": [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -21,12 +89,66 @@ class OllamaClient:
         if json_only:
             payload["format"] = "json"
 
+        def call() -> str:
+            if self.admission is None:
+                return self._post(url, model, payload)
+            with self.admission.slot():
+                return self._post(url, model, payload)
+
+        if self.flight is None:
+            return call()
+        return self.flight.do((model, system, user, temperature, json_only), call)
+
+    def _post(self, url: str, model: str, payload: Dict[str, Any]) -> str:
         req = urllib.request.Request(
             url,
             data=json.dumps(payload).encode("utf-8"),
             headers={"Content-Type": "application/json"},
             method="POST",
         )
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            return data["message"]["content"]
+        start = time.perf_counter()
+        ok = False
+        try:
+            with urllib.request.urlopen(req, timeout=120) as resp:
+                data = json.loads(resp.read().decode("utf-8"))
+                content = data["message"]["content"]
+            ok = True
+            return content
+        finally:
+            self.stats.record_call(model, time.perf_counter() - start, ok=ok)
+
+    def preload(self, model: Optional[str] = None, keep_alive: str = "30m") -> None:
+        """Tiny one-token chat so Ollama loads the model into memory before the first question."""
+        model = model or self.model
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": "ok"}],
+            "options": {"num_predict": 1},
+            "keep_alive": keep_alive,
+            "stream": False,
+        }
+        req = urllib.request.Request(
+            f"{self.base_url}/api/chat",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=300) as resp:
+            resp.read()
+
+    def chat_json(self, system: str, user: str, parse: Callable[[str], T], temperature: float = 0.0) -> T:
+        """JSON-mode chat whose output must pass `parse`; escalates once to the larger model on failure."""
+        raw = self.chat(system, user, temperature=temperature, json_only=True)
+        try:
+            out = parse(raw)
+        except Exception:
+            if not self.escalation_model:
+                self.stats.record_json_call(self.agent, escalated=False)
+                raise
+        else:
+            self.stats.record_json_call(self.agent, escalated=False)
+            return out
+
+        self.stats.record_json_call(self.agent, escalated=True)
+        raw = self.chat(system, user, temperature=temperature, json_only=True, model=self.escalation_model)
+        return parse(raw)
@@ -0,0 +1,72 @@
+import os
+from typing import Any, Dict, Optional
+
+from src.concurrency import AdmissionQueue, SingleFlight
+from src.llm.ollama_client import ModelStats, OllamaClient
+
+AGENTS = ("planner", "cypher", "answer", "verifier")
+
+
+class ModelRouter:
+    """One OllamaClient per agent, so JSON-only classification calls can run on a small model."""
+
+    def __init__(
+        self,
+        base_url: str,
+        default_model: str,
+        agent_models: Optional[Dict[str, str]] = None,
+        escalation_model: Optional[str] = None,
+        max_concurrent: int = 2,
+        max_waiting: Optional[int] = 32,
+    ):
+        agent_models = agent_models or {}
+        # Agents on a smaller model fall back to the default model unless told otherwise
+        escalation_model = escalation_model or default_model
+        self.stats = ModelStats()
+        # One local model server: coalesce identical prompts and cap concurrent requests
+        self.flight = SingleFlight()
+        self.admission = AdmissionQueue(max_concurrent, max_waiting=max_waiting)
+        self.clients: Dict[str, OllamaClient] = {}
+        for agent in AGENTS:
+            self.clients[agent] = OllamaClient(
+                base_url,
+                agent_models.get(agent) or default_model,
+                escalation_model=escalation_model,
+                agent=agent,
+                stats=self.stats,
+                flight=self.flight,
+                admission=self.admission,
+            )
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        # OLLAMA_MODEL stays the default (and the escalation target) for every agent;
+        # e.g. OLLAMA_PLANNER_MODEL=qwen2.5:1.5b moves only the planner to a small model.
+        default_model = os.environ["OLLAMA_MODEL"]
+        agent_models = {}
+        for agent in AGENTS:
+            m = os.environ.get(f"OLLAMA_{agent.upper()}_MODEL")
+            if m:
+                agent_models[agent] = m
+        return cls(
+            os.environ["OLLAMA_BASE_URL"],
+            default_model,
+            agent_models=agent_models,
+            escalation_model=os.environ.get("OLLAMA_ESCALATION_MODEL"),
+            max_concurrent=int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "2")),
+            max_waiting=int(os.environ.get("OLLAMA_MAX_QUEUE", "32")),
+        )
+
+    def for_agent(self, agent: str) -> OllamaClient:
+        return self.clients[agent]
+
+    def models(self) -> Dict[str, str]:
+        return {agent: c.model for agent, c in self.clients.items()}
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "routing": self.models(),
+            **self.stats.snapshot(),
+            "coalescing": self.flight.stats(),
+            "admission": self.admission.stats(),
+        }
@@ -0,0 +1,218 @@
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from src.agents.answer_agent import answer as answer_fn
+from src.agents.cypher_agent import build_cypher
+from src.agents.planner import Plan, make_plan
+from src.agents.verifier import verify as verify_fn
+from src.concurrency import SingleFlight
+from src.db.neo4j_client import Neo4jClient
+from src.llm.router import ModelRouter
+from src.rag.catalog import CatalogCache
+from src.rag.course_graph import course_graph
+from src.rag.eligibility import check_eligibility, eligible_frontier
+from src.rag.entity_index import EntityIndex
+from src.rag.formatters import extract_shortest_path, format_path_nodes
+from src.rag.scheduler import DEFAULT_MAX_CREDITS, schedule_program
+from src.rag.topic_index import TopicIndex
+from src.session import SessionContext
+
+# Identical questions asked concurrently (registration spikes) share one pipeline run
+_FLIGHT = SingleFlight()
+
+_SPACES = re.compile(r"\s+")
+
+# on_stage(name, data) is called as each stage finishes: "plan", "cypher", "rows", "answer", "verifier"
+StageCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def normalize_question(question: str) -> str:
+    return _SPACES.sub(" ", question.strip().lower()).rstrip("?!. ")
+
+
+def _result(plan: Plan, question: str, rows: List[Dict[str, Any]], ans: str, reason: str, **extra) -> Dict[str, Any]:
+    # Deterministic shortcuts are computed from the graph, so they skip the LLM verifier
+    out = {
+        "question": question,
+        "plan": plan,
+        "rows": rows,
+        "cypher": "",
+        "params": {},
+        "answer": ans,
+        "verifier": {"verdict": "pass", "reason": reason, "followup_cypher_hint": ""},
+        "steps": [],
+    }
+    out.update(extra)
+    return out
+
+
+def _run(
+    router: ModelRouter,
+    neo: Neo4jClient,
+    catalog: CatalogCache,
+    question: str,
+    session: Optional[SessionContext] = None,
+    on_stage: Optional[StageCallback] = None,
+) -> Dict[str, Any]:
+    def emit(name: str, **data) -> None:
+        if on_stage is not None:
+            on_stage(name, data)
+
+    index = catalog.derived("entities", EntityIndex.from_catalog)
+    plan = session.plan_follow_up(question, index) if session is not None else None
+    if plan is None:
+        plan = make_plan(router.for_agent("planner"), question, index=index)
+        if session is not None:
+            plan = session.fill_plan(plan, question, index)
+    emit("plan", plan=plan.model_dump())
+    answer_llm = router.for_agent("answer")
+
+    # ---- Eligibility shortcut (deterministic + impressive) ----
+    if plan.intent == "eligibility_check" and plan.target_course:
+        eligible, missing = check_eligibility(neo, plan.target_course, plan.completed_courses)
+        if eligible:
+            ans = f"Yes — you appear eligible to take {plan.target_course}. (All prerequisites are satisfied based on the graph.)"
+        else:
+            missing_str = ", ".join([m["code"] for m in missing]) if missing else "unknown prerequisites"
+            ans = f"Not yet — to take {plan.target_course}, you’re missing: {missing_str}."
+        emit("rows", count=len(missing))
+        emit("answer", answer=ans)
+        return _result(plan, question, missing, ans, "Eligibility computed from graph.")
+
+    # ---- Topic search over course descriptions (BM25, no Cypher) ----
+    if plan.intent == "topic_search":
+        topics = catalog.derived("topics", TopicIndex.from_catalog)
+        rows = topics.search(
+            plan.topic or question,
+            department=plan.department,
+            level=plan.level,
+            program_id=plan.program_ids[0] if plan.program_ids else None,
+        )
+        emit("rows", count=len(rows))
+        ans = answer_fn(answer_llm, plan, question, rows)
+        emit("answer", answer=ans)
+        return _result(plan, question, rows, ans, "Ranked from the course topic index.")
+
+    # ---- Eligible frontier: everything takeable now, one in-memory pass ----
+    if plan.intent == "eligible_courses":
+        rows = eligible_frontier(
+            course_graph(catalog),
+            plan.completed_courses,
+            program_id=plan.program_ids[0] if plan.program_ids else None,
+        )
+        emit("rows", count=len(rows))
+        ans = answer_fn(answer_llm, plan, question, rows)
+        emit("answer", answer=ans)
+        return _result(plan, question, rows, ans, "Eligible frontier computed from graph.")
+
+    # ---- Degree plan (deterministic scheduler; the LLM only phrases it) ----
+    if plan.intent == "degree_plan" and plan.program_ids:
+        schedule = schedule_program(
+            course_graph(catalog),
+            plan.program_ids[0],
+            plan.completed_courses,
+            max_credits=plan.max_credits or DEFAULT_MAX_CREDITS,
+            include_electives=plan.include_electives,
+        )
+        emit("rows", count=len(schedule["rows"]))
+        meta = {k: v for k, v in schedule.items() if k != "rows"}
+        if schedule.get("error"):
+            ans = f"I couldn't find program {plan.program_ids[0]} in the graph."
+        else:
+            ans = answer_fn(answer_llm, plan, question, schedule["rows"], meta=meta)
+        emit("answer", answer=ans)
+        return _result(plan, question, schedule["rows"], ans, "Schedule computed from the graph.", meta=meta)
+
+    # ---- Follow-up answerable from rows this session already fetched ----
+    rows = session.reuse_rows(plan) if session is not None else None
+    if rows is not None:
+        session.reused += 1
+        emit("rows", count=len(rows), reused=True)
+        ans = answer_fn(answer_llm, plan, question, rows)
+        emit("answer", answer=ans)
+        return _result(plan, question, rows, ans, "Answered from rows fetched earlier in this session.", reused=True)
+
+    # ---- Agentic loop with verifier follow-up ----
+    hint = ""
+    steps: List[Dict[str, Any]] = []
+    rows: List[Dict[str, Any]] = []
+    ans = ""
+    cypher = ""
+    params: Dict[str, Any] = {}
+    for step in range(2):
+        cy = build_cypher(router.for_agent("cypher"), plan, question, hint=hint)
+        cypher, params = cy.cypher, cy.params
+        emit("cypher", step=step + 1, cypher=cypher, params=params)
+        rows = neo.run_read(cypher, params)
+        emit("rows", step=step + 1, count=len(rows))
+
+        # Pretty path output support (if cypher returned path_nodes)
+        path_nodes = extract_shortest_path(rows) if plan.intent == "prereq_path" else []
+        if path_nodes:
+            target = plan.course_codes[0] if plan.course_codes else ""
+            ans = f"Shortest prerequisite path to {target}:\n{format_path_nodes(path_nodes)}"
+        else:
+            ans = answer_fn(answer_llm, plan, question, rows)
+
+        emit("answer", step=step + 1, answer=ans)
+        ver = verify_fn(router.for_agent("verifier"), question, rows, ans)
+        emit("verifier", step=step + 1, **ver.model_dump())
+        steps.append({"cypher": cypher, "params": params, "rows": rows, "answer": ans, "verifier": ver.model_dump()})
+
+        if ver.verdict == "pass":
+            break
+        if ver.verdict == "needs_more" and step == 0:
+            hint = ver.followup_cypher_hint or "Retrieve more relevant course/program nodes and relationships."
+            continue
+        break
+
+    return {
+        "question": question,
+        "plan": plan,
+        "rows": rows,
+        "cypher": cypher,
+        "params": params,
+        "answer": ans,
+        "verifier": steps[-1]["verifier"] if steps else {},
+        "steps": steps,
+    }
+
+
+def run_pipeline(
+    router: ModelRouter,
+    neo: Neo4jClient,
+    catalog: CatalogCache,
+    question: str,
+    coalesce: bool = True,
+    session: Optional[SessionContext] = None,
+    on_stage: Optional[StageCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Plan -> (shortcut | cypher -> rows -> answer -> verify) for one question.
+
+    Returns {"question", "plan", "rows", "cypher", "params", "answer", "verifier", "steps"}
+    (+ "meta" for degree plans, "reused" when answered from session rows). With `coalesce`,
+    concurrent callers asking the same normalized question share one run and receive the
+    same result object, so treat it as read-only. With a `session`, follow-ups resolve
+    against earlier turns and the result is remembered there. `on_stage` sees stage results
+    as they complete, including callers that joined a coalesced question mid-run. Raises
+    src.concurrency.AdmissionRejected when the LLM queue is full.
+    """
+    if not coalesce:
+        result = _run(router, neo, catalog, question, session, on_stage)
+    else:
+        # "What does it unlock?" means different things in different sessions
+        key = normalize_question(question) if session is None else (normalize_question(question), session.focus())
+        # Stage events go through the flight so callers joining this question see them too
+        result = _FLIGHT.do(
+            key,
+            lambda: _run(router, neo, catalog, question, session, lambda name, data: _FLIGHT.notify(key, name, data)),
+            listener=on_stage,
+        )
+    if session is not None:
+        session.remember(result)
+    return result
+
+
+def pipeline_stats() -> Dict[str, Any]:
+    return _FLIGHT.stats()
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.db.neo4j_client import Neo4jClient
+
+# Rows use the same keys as the CSVs in data/, so a catalog can be built from either source.
+COURSES = """
+MATCH (c:Course)
+RETURN c.course_code AS course_code, c.title AS title, c.department AS department,
+       c.level AS level, c.credits AS credits, c.description AS description
+ORDER BY course_code
+"""
+
+PROGRAMS = """
+MATCH (p:Program)
+RETURN p.program_id AS program_id, p.program_name AS program_name, p.degree_type AS degree_type,
+       p.department AS department, p.description AS description
+ORDER BY program_id
+"""
+
+PREREQS = """
+MATCH (pre:Course)-[:PREREQUISITE]->(c:Course)
+RETURN c.course_code AS course_code, pre.course_code AS prereq_code
+"""
+
+REQUIRES = """
+MATCH (p:Program)-[r:REQUIRES]->(c:Course)
+RETURN p.program_id AS program_id, c.course_code AS course_code, r.requirement_type AS requirement_type
+"""
+
+# Cheap change detector: counts come from the count store, text sizes catch title/description edits.
+FINGERPRINT = """
+MATCH (c:Course)
+WITH count(c) AS courses, sum(size(coalesce(c.title, '')) + size(coalesce(c.description, ''))) AS course_chars
+OPTIONAL MATCH (p:Program)
+WITH courses, course_chars, count(p) AS programs, sum(size(coalesce(p.program_name, ''))) AS program_chars
+OPTIONAL MATCH ()-[r:PREREQUISITE]->()
+WITH courses, course_chars, programs, program_chars, count(r) AS prereqs
+OPTIONAL MATCH ()-[q:REQUIRES]->()
+RETURN courses, course_chars, programs, program_chars, prereqs, count(q) AS requires
+"""
+
+Catalog = Dict[str, List[Dict[str, Any]]]
+
+
+def load_catalog(neo: Neo4jClient) -> Catalog:
+    return {
+        "courses": neo.run_read(COURSES),
+        "programs": neo.run_read(PROGRAMS),
+        "prereqs": neo.run_read(PREREQS),
+        "requires": neo.run_read(REQUIRES),
+    }
+
+
+def catalog_fingerprint(neo: Neo4jClient) -> str:
+    rows = neo.run_read(FINGERPRINT)
+    if not rows:
+        return ""
+    r = rows[0]
+    keys = ("courses", "course_chars", "programs", "program_chars", "prereqs", "requires")
+    return ":".join(str(r.get(k) or 0) for k in keys)
+
+
+class CatalogCache:
+    """
+    Process-wide in-memory copy of the catalog, re-read from Neo4j when the graph changes.
+
+    Derived structures (indexes) register a builder with `derived(name, build)`; the builder
+    is called as `build(catalog, previous)` once per catalog version, so it can update the
+    previous index incrementally instead of starting over.
+    """
+
+    def __init__(self, neo: Neo4jClient, ttl_seconds: float = 30.0, snapshot_path: Optional[str] = None):
+        self.neo = neo
+        self.ttl_seconds = ttl_seconds
+        # Optional mmap'd snapshot (see src/rag/snapshot.py) used for a cold start without queries
+        self.snapshot_path = snapshot_path
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._data: Optional[Catalog] = None
+        self._fingerprint = ""
+        self._checked_at = 0.0
+        self.version = 0
+        self._derived: Dict[str, Any] = {}
+        self._derived_version: Dict[str, int] = {}
+
+    def _reload(self, fingerprint: str) -> None:
+        self._data = load_catalog(self.neo)
+        self._fingerprint = fingerprint
+        self.snapshot = None  # no longer matches the graph
+        self.version += 1
+
+    def _load_snapshot(self) -> bool:
+        # Imported lazily: snapshot.py depends on this module for the Catalog type
+        from src.rag.snapshot import CatalogSnapshot, SnapshotCatalog, SnapshotError
+
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            snap = CatalogSnapshot.open(self.snapshot_path)
+        except (OSError, SnapshotError):
+            return False
+        self.snapshot = snap
+        # Rows are decoded per table on first read; the course graph reads the mapping directly
+        self._data = SnapshotCatalog(snap)
+        # The stamped fingerprint is compared with the live graph at the next TTL check
+        self._fingerprint = snap.fingerprint
+        self.version += 1
+        return True
+
+    def get(self) -> Catalog:
+        with self._lock:
+            now = time.monotonic()
+            if self._data is None:
+                if not self._load_snapshot():
+                    self._reload(catalog_fingerprint(self.neo))
+                self._checked_at = now
+            elif now - self._checked_at >= self.ttl_seconds:
+                self._checked_at = now
+                fp = catalog_fingerprint(self.neo)
+                if fp != self._fingerprint:
+                    self._reload(fp)
+            return self._data
+
+    def refresh(self) -> Catalog:
+        """Force a staleness check on the next `get` (e.g. right after an import)."""
+        with self._lock:
+            self._checked_at = 0.0
+        return self.get()
+
+    def derived(self, name: str, build: Callable[[Catalog, Any], Any]) -> Any:
+        data = self.get()
+        with self._lock:
+            if self._derived_version.get(name) != self.version:
+                self._derived[name] = build(data, self._derived.get(name))
+                self._derived_version[name] = self.version
+            return self._derived[name]
@@ -0,0 +1,113 @@
+from array import array
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from src.rag.catalog import Catalog, CatalogCache
+from src.rag.snapshot import CatalogSnapshot, ProgramRequirements, SnapshotCatalog, build_csr
+
+
+class CourseGraph:
+    """
+    Integer-indexed PREREQUISITE / REQUIRES graph for in-memory planning passes.
+    Courses are indexed in course-code order, so comparing indices compares codes.
+
+    Adjacency is CSR (offsets + targets). Built from a snapshot, the CSR arrays, the
+    code/title/department/credit columns and the REQUIRES lists are all read from the
+    mapping on access, so nothing is copied; built from catalog rows, they are arrays and lists.
+    """
+
+    def __init__(
+        self,
+        codes: Sequence[str],
+        titles: Sequence[str],
+        departments: Sequence[str],
+        credits: Sequence[int],
+        prereq_csr: Tuple[Sequence[int], Sequence[int]],
+        unlock_csr: Tuple[Sequence[int], Sequence[int]],
+        requires: Mapping[str, List[Tuple[int, str]]],
+        programs: Sequence[str] = (),
+        index_of: Optional[Callable[[str], Optional[int]]] = None,
+    ):
+        self.codes = codes
+        self.titles = titles
+        self.departments = departments
+        self.credits = credits
+        self.index_of = index_of or {c: i for i, c in enumerate(codes)}.get
+        self._pre_off, self._pre = prereq_csr
+        self._unl_off, self._unl = unlock_csr
+        self.requires = requires  # program_id -> [(course index, requirement type)]
+        # Every catalog program, including ones without REQUIRES edges
+        self.programs = frozenset(programs) | frozenset(requires)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog, previous: Optional["CourseGraph"] = None) -> "CourseGraph":
+        courses = sorted(catalog.get("courses", []), key=lambda c: c["course_code"])
+        codes = [c["course_code"] for c in courses]
+        index = {c: i for i, c in enumerate(codes)}
+        credits = array("i")
+        for c in courses:
+            try:
+                credits.append(int(c.get("credits") or 0))
+            except (TypeError, ValueError):
+                credits.append(0)
+        edges = []  # (course, prereq)
+        for r in catalog.get("prereqs", []):
+            c, pre = index.get(r["course_code"]), index.get(r["prereq_code"])
+            if c is not None and pre is not None:
+                edges.append((c, pre))
+        edges.sort()
+        requires: Dict[str, List[Tuple[int, str]]] = {}
+        for r in catalog.get("requires", []):
+            c = index.get(r["course_code"])
+            if c is not None:
+                requires.setdefault(r["program_id"], []).append((c, r.get("requirement_type") or ""))
+        return cls(
+            codes,
+            [c.get("title") or "" for c in courses],
+            [c.get("department") or "" for c in courses],
+            credits,
+            build_csr(len(codes), edges),
+            build_csr(len(codes), sorted((pre, c) for c, pre in edges)),
+            requires,
+            [p["program_id"] for p in catalog.get("programs", []) if p.get("program_id")],
+        )
+
+    @classmethod
+    def from_snapshot(cls, snap: CatalogSnapshot) -> "CourseGraph":
+        requires = ProgramRequirements(snap)
+        return cls(
+            snap.course_column("code"),
+            snap.course_column("title"),
+            snap.course_column("department"),
+            snap.course_column("credits"),
+            snap.csr("prereq"),
+            snap.csr("unlock"),
+            requires,
+            list(requires),
+            index_of=snap.course_index,
+        )
+
+    def prereqs(self, i: int) -> Sequence[int]:
+        return self._pre[self._pre_off[i]:self._pre_off[i + 1]]
+
+    def unlocks(self, i: int) -> Sequence[int]:
+        return self._unl[self._unl_off[i]:self._unl_off[i + 1]]
+
+    def indegree(self, i: int) -> int:
+        return self._pre_off[i + 1] - self._pre_off[i]
+
+    def indices(self, codes: Sequence[str]) -> List[int]:
+        found = (self.index_of(c) for c in codes)
+        return [i for i in found if i is not None]
+
+
+def course_graph(cache: CatalogCache) -> CourseGraph:
+    """The CourseGraph for the cache's current catalog version (zero-copy when a snapshot is mapped)."""
+    def build(data: Catalog, previous: Optional[CourseGraph]) -> CourseGraph:
+        if isinstance(data, SnapshotCatalog):
+            return CourseGraph.from_snapshot(data.snapshot)
+        return CourseGraph.from_catalog(data)
+
+    return cache.derived("graph", build)
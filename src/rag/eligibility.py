@@ -1,5 +1,6 @@
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from src.db.neo4j_client import Neo4jClient
+from src.rag.course_graph import CourseGraph
 
 PREREQS_ALL = """
 MATCH (pre:Course)-[:PREREQUISITE*1..6]->(target:Course {course_code:$code})
@@ -20,3 +21,39 @@ def check_eligibility(
     missing = [{"code": r["code"], "title": r.get("title", "")} for r in rows if r["code"] in missing_codes]
     eligible = (len(missing) == 0)
     return eligible, missing
+
+def eligible_frontier(
+    graph: CourseGraph,
+    completed: Sequence[str],
+    program_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Every not-yet-completed course whose direct prerequisites are all completed
+    (optionally restricted to one program), in one indegree-counting pass.
+
+    Each completed course credits its unlocks once; a course is eligible when that count
+    equals its number of direct prerequisites. Cost is O(courses + edges out of the completed set).
+    """
+    n = len(graph)
+    done = bytearray(n)
+    satisfied = [0] * n
+    for i in set(graph.indices(completed)):
+        done[i] = 1
+        for u in graph.unlocks(i):
+            satisfied[u] += 1
+
+    if program_id:
+        candidates = graph.requires.get(program_id, [])
+    else:
+        candidates = [(i, None) for i in range(n)]
+    rows = []
+    for i, typ in candidates:
+        if not done[i] and satisfied[i] == graph.indegree(i):
+            rows.append({
+                "code": graph.codes[i],
+                "title": graph.titles[i],
+                "department": graph.departments[i],
+                "requirement_type": typ,
+            })
+    rows.sort(key=lambda r: r["code"])
+    return rows
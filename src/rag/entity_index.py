@@ -0,0 +1,234 @@
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.rag.catalog import Catalog
+
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "after", "before", "can", "course", "courses", "do", "does", "for",
+    "from", "if", "in", "is", "it", "me", "my", "need", "of", "on", "or", "program", "take",
+    "the", "to", "what", "which", "with",
+}
+
+# "I" the pronoun; not a title stopword, where it is a Roman numeral ("Calculus I")
+QUESTION_STOPWORDS = STOPWORDS | {"i"}
+
+# Common question words: not catalog vocabulary, but never worth trigram-matching either
+QUERY_WORDS = {
+    "chain", "completed", "core", "cover", "covers", "did", "done", "electives", "eligible", "finished",
+    "path", "prereq", "prereqs", "prerequisite", "prerequisites", "requirement", "requirements",
+    "shortest", "tell", "unlock", "unlocks",
+}
+
+# Spelled-out forms of Program.degree_type, used to build program aliases
+DEGREE_NAMES = {
+    "MS": ["ms", "msc", "master of science", "masters", "master s", "masters of science"],
+    "BS": ["bs", "bsc", "bachelor of science", "bachelors", "bachelor s"],
+    "BA": ["ba", "bachelor of arts", "bachelors", "bachelor s"],
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# "Calculus 2" and "Calculus II" are the same course
+_NUMERALS = {"1": "i", "2": "ii", "3": "iii", "4": "iv", "5": "v"}
+_CODE_PARTS = re.compile(r"^([A-Za-z]{2,4})(\d{3})$")
+
+# Scores are scaled by match method so an exact alias always beats a fuzzy one
+EXACT, TOKEN, TRIGRAM = 1.0, 0.95, 0.9
+AMBIGUITY_MARGIN = 0.03
+
+
+def normalize(text: str) -> str:
+    tokens = _NON_ALNUM.sub(" ", (text or "").lower()).split()
+    return " ".join(_NUMERALS.get(t, t) for t in tokens)
+
+
+def _trigrams(s: str) -> Set[str]:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _content_tokens(tokens: List[str], stopwords: Set[str] = STOPWORDS) -> frozenset:
+    return frozenset(t for t in tokens if t not in stopwords)
+
+
+class EntityIndex:
+    """
+    In-memory resolver from free-text mentions to Course codes / Program ids.
+
+    Every course and program gets a handful of normalized aliases (code, "cse 115",
+    title, program name, degree spellings). `resolve` scans the question's token windows
+    and scores them against the aliases by exact lookup, content-token Jaccard and
+    character-trigram Dice, keeping the best non-overlapping matches.
+    """
+
+    def __init__(self):
+        self.entities: List[Tuple[str, str, str]] = []  # (kind, id, label)
+        self.exact: Dict[str, Tuple[int, float]] = {}  # alias -> (entity, weight)
+        self.aliases: List[Tuple[int, float, frozenset, Set[str]]] = []  # (entity, weight, tokens, trigrams)
+        self.token_postings: Dict[str, List[int]] = {}
+        self.trigram_postings: Dict[str, List[int]] = {}
+        self.max_window = 1
+        self._by_id: Dict[Tuple[str, str], int] = {}
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog, previous: Optional["EntityIndex"] = None) -> "EntityIndex":
+        # Full rebuild: a few thousand aliases index in milliseconds, so `previous` is not reused.
+        idx = cls()
+        for c in catalog.get("courses", []):
+            code = c.get("course_code")
+            if not code:
+                continue
+            title = c.get("title") or ""
+            e = idx._add_entity("course", code, title)
+            idx._add_alias(e, code)
+            m = _CODE_PARTS.match(code)
+            if m:
+                idx._add_alias(e, f"{m.group(1)} {m.group(2)}")
+            if title:
+                idx._add_alias(e, title)
+                idx._add_alias(e, f"{code} {title}")
+        for p in catalog.get("programs", []):
+            pid = p.get("program_id")
+            if not pid:
+                continue
+            name = p.get("program_name") or ""
+            e = idx._add_entity("program", pid, name)
+            idx._add_alias(e, pid)
+            if name:
+                idx._add_alias(e, name)
+            degree = (p.get("degree_type") or "").upper()
+            words = normalize(name).split()
+            # "MS Data Science" -> field "data science"
+            field = " ".join(words[1:]) if words and words[0] == degree.lower() else " ".join(words)
+            if field:
+                idx._add_alias(e, field, weight=0.9)
+                for d in DEGREE_NAMES.get(degree, [degree.lower()] if degree else []):
+                    idx._add_alias(e, f"{d} {field}")
+                    idx._add_alias(e, f"{d} in {field}")
+                    idx._add_alias(e, f"{field} {d}")
+        return idx
+
+    def _add_entity(self, kind: str, eid: str, label: str) -> int:
+        self.entities.append((kind, eid, label))
+        self._by_id[(kind, eid.upper())] = len(self.entities) - 1
+        return len(self.entities) - 1
+
+    def _add_alias(self, entity: int, text: str, weight: float = 1.0) -> None:
+        key = normalize(text)
+        if not key:
+            return
+        prev = self.exact.get(key)
+        if prev is not None and prev[1] >= weight:
+            return
+        self.exact[key] = (entity, weight)
+        tokens = key.split()
+        self.max_window = max(self.max_window, len(tokens))
+        aid = len(self.aliases)
+        grams = _trigrams(key)
+        self.aliases.append((entity, weight, _content_tokens(tokens), grams))
+        for t in set(tokens):
+            if t not in STOPWORDS:
+                self.token_postings.setdefault(t, []).append(aid)
+        for g in grams:
+            self.trigram_postings.setdefault(g, []).append(aid)
+
+    def _fuzzy(self, window: str, tokens: List[str], trigrams: bool) -> Dict[int, Tuple[float, str]]:
+        best: Dict[int, Tuple[float, str]] = {}
+        wtok = _content_tokens(tokens, QUESTION_STOPWORDS)
+        if wtok:
+            seen: Set[int] = set()
+            supersets: Set[int] = set()
+            for t in wtok:
+                for aid in self.token_postings.get(t, ()):
+                    if aid in seen:
+                        continue
+                    seen.add(aid)
+                    entity, weight, atok, _ = self.aliases[aid]
+                    if wtok < atok:
+                        supersets.add(entity)
+                    score = TOKEN * weight * len(wtok & atok) / len(wtok | atok)
+                    if score > best.get(entity, (0.0, ""))[0]:
+                        best[entity] = (score, "token")
+            # A window that is only part of several titles ("calculus": I and II) names neither
+            if len(supersets) > 1:
+                return {}
+        if trigrams and len(window) >= 4:
+            wgrams = _trigrams(window)
+            shared: Dict[int, int] = {}
+            for g in wgrams:
+                for aid in self.trigram_postings.get(g, ()):
+                    shared[aid] = shared.get(aid, 0) + 1
+            for aid, n in shared.items():
+                entity, weight, _, agrams = self.aliases[aid]
+                score = TRIGRAM * weight * 2.0 * n / (len(wgrams) + len(agrams))
+                if score > best.get(entity, (0.0, ""))[0]:
+                    best[entity] = (score, "trigram")
+        if len(best) > 1:
+            # A fuzzy window that fits two entities equally well is ambiguous ("data structures")
+            ranked = sorted(best.items(), key=lambda kv: -kv[1][0])
+            if ranked[0][1][0] - ranked[1][1][0] < AMBIGUITY_MARGIN:
+                return {}
+            return dict(ranked[:1])
+        return best
+
+    def resolve(self, question: str, min_score: float = 0.65) -> List[Dict[str, Any]]:
+        """Return non-overlapping entity mentions, in question order: {kind, id, label, text, score, method}."""
+        tokens = normalize(question).split()
+        # Trigram scoring only pays off for windows holding a word the catalog doesn't know (typos)
+        unknown = [t not in QUESTION_STOPWORDS and t not in QUERY_WORDS and t not in self.token_postings for t in tokens]
+        candidates = []
+        for i in range(len(tokens)):
+            if tokens[i] in QUESTION_STOPWORDS:
+                continue
+            for j in range(i + 1, min(len(tokens), i + self.max_window) + 1):
+                if tokens[j - 1] in STOPWORDS:
+                    continue
+                window = " ".join(tokens[i:j])
+                hit = self.exact.get(window)
+                if hit is not None:
+                    found = {hit[0]: (EXACT * hit[1], "exact")}
+                elif tokens[j - 1] in QUESTION_STOPWORDS:
+                    # A trailing "i" only counts as part of an exact title ("calculus i")
+                    continue
+                else:
+                    found = self._fuzzy(window, tokens[i:j], trigrams=any(unknown[i:j]))
+                for entity, (score, method) in found.items():
+                    if score >= min_score:
+                        candidates.append((score, j - i, i, j, entity, method, window))
+
+        # Best score first, longer spans break ties; then drop overlaps and repeats
+        candidates.sort(key=lambda c: (-c[0], -c[1], c[2]))
+        taken = [False] * len(tokens)
+        used: Set[int] = set()
+        out = []
+        for score, _, i, j, entity, method, window in candidates:
+            if entity in used or any(taken[i:j]):
+                continue
+            used.add(entity)
+            for k in range(i, j):
+                taken[k] = True
+            kind, eid, label = self.entities[entity]
+            out.append({"kind": kind, "id": eid, "label": label, "text": window, "score": round(score, 3),
+                        "method": method, "start": i})
+        out.sort(key=lambda m: m["start"])
+        for m in out:
+            del m["start"]
+        return out
+
+    def canonical(self, kind: str, text: Optional[str], min_score: float = 0.65) -> Optional[str]:
+        """Map a code/id, title or name (e.g. an LLM-filled plan field) to the canonical id."""
+        if not text:
+            return None
+        e = self._by_id.get((kind, text.strip().upper()))
+        if e is not None:
+            return self.entities[e][1]
+        for m in self.resolve(text, min_score=min_score):
+            if m["kind"] == kind:
+                return m["id"]
+        return None
+
+    def extract(self, question: str) -> Tuple[List[str], List[str]]:
+        """(course_codes, program_ids) mentioned in the question."""
+        matches = self.resolve(question)
+        courses = [m["id"] for m in matches if m["kind"] == "course"]
+        programs = [m["id"] for m in matches if m["kind"] == "program"]
+        return courses, programs
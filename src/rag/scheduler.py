@@ -0,0 +1,248 @@
+import heapq
+from typing import Any, Dict, List, Sequence
+
+from src.rag.course_graph import CourseGraph
+
+DEFAULT_MAX_CREDITS = 15
+# How many ready-but-too-big courses to look past before closing a term
+MAX_SKIPS_PER_TERM = 8
+
+
+def _cycle_members(stuck: List[int], succ: List[List[int]], n: int) -> List[int]:
+    """Nodes of `stuck` that lie on a cycle (non-trivial SCC or self-loop); iterative Tarjan."""
+    is_stuck = bytearray(n)
+    for i in stuck:
+        is_stuck[i] = 1
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    stack: List[int] = []
+    members: List[int] = []
+    counter = 0
+    for root in stuck:
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while work:
+            v, k = work[-1]
+            nbrs = succ[v]
+            while k < len(nbrs) and not is_stuck[nbrs[k]]:
+                k += 1
+            if k < len(nbrs):
+                work[-1] = (v, k + 1)
+                u = nbrs[k]
+                if index[u] == -1:
+                    index[u] = low[u] = counter
+                    counter += 1
+                    stack.append(u)
+                    on_stack[u] = 1
+                    work.append((u, 0))
+                elif on_stack[u]:
+                    low[v] = min(low[v], index[u])
+                continue
+            work.pop()
+            if work:
+                p = work[-1][0]
+                low[p] = min(low[p], low[v])
+            if low[v] == index[v]:
+                scc = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    scc.append(w)
+                    if w == v:
+                        break
+                if len(scc) > 1 or v in succ[v]:
+                    members.extend(scc)
+    return members
+
+
+def schedule_program(
+    graph: CourseGraph,
+    program_id: str,
+    completed: Sequence[str] = (),
+    max_credits: int = DEFAULT_MAX_CREDITS,
+    include_electives: bool = False,
+) -> Dict[str, Any]:
+    """
+    Deterministic term-by-term plan to finish a program.
+
+    Remaining work = program requirements (Core, plus Electives if asked) not yet completed,
+    together with any uncompleted prerequisites they depend on. Courses are released in
+    topological order and packed greedily into terms under `max_credits`, longest remaining
+    prerequisite chain first, so the plan length tracks the critical path.
+
+    Returns {"program_id", "rows", "required_courses", "terms", "total_credits", "critical_path",
+    "critical_path_terms", "max_credits", "electives", "cycle", "blocked"}; rows look like
+    {"term", "code", "title", "credits", "requirement_type", "critical"}. `cycle` lists
+    courses on a prerequisite cycle, `blocked` courses that only depend on one.
+    """
+    if program_id not in graph.programs:
+        return {"program_id": program_id, "rows": [], "error": f"Unknown program {program_id}"}
+    reqs = graph.requires.get(program_id, [])
+    max_credits = max(1, int(max_credits or DEFAULT_MAX_CREDITS))
+    done = set(graph.indices(completed))
+
+    # ---- 1. Remaining courses: requirements + their uncompleted prerequisite closure ----
+    req_type: Dict[int, str] = {}  # REQUIRES type of every uncompleted program course
+    targets: List[int] = []
+    electives: List[int] = []
+    for i, typ in reqs:
+        if i in done:
+            continue
+        req_type[i] = typ or "Required"
+        if typ.lower() == "elective" and not include_electives:
+            electives.append(i)
+        else:
+            targets.append(i)
+    n = len(graph)
+    is_done = bytearray(n)
+    for i in done:
+        is_done[i] = 1
+    is_needed = bytearray(n)
+    needed = list(targets)
+    for i in needed:
+        is_needed[i] = 1
+    for i in needed:  # `needed` grows while we iterate
+        for p in graph.prereqs(i):
+            if not is_done[p] and not is_needed[p]:
+                is_needed[p] = 1
+                needed.append(p)
+    # An elective pulled in as a prerequisite of a Core course is scheduled, not pending
+    electives = [i for i in electives if not is_needed[i]]
+
+    # Successors restricted to the remaining subgraph, reused by every pass below
+    succ: List[List[int]] = [[] for _ in range(n)]
+    indeg = [0] * n
+    for i in needed:
+        s = succ[i]
+        for u in graph.unlocks(i):
+            if is_needed[u]:
+                s.append(u)
+                indeg[u] += 1
+
+    # ---- 2. Kahn's order over the remaining subgraph (cycle members never reach indegree 0) ----
+    remaining = list(indeg)
+    order = [i for i in needed if indeg[i] == 0]
+    for i in order:  # `order` grows while we iterate
+        for u in succ[i]:
+            remaining[u] -= 1
+            if remaining[u] == 0:
+                order.append(u)
+    stuck = [i for i in needed if remaining[i] > 0]
+    in_cycle = set(_cycle_members(stuck, succ, n)) if stuck else set()
+    cycle = sorted(graph.codes[i] for i in in_cycle)
+    blocked = sorted(graph.codes[i] for i in stuck if i not in in_cycle)
+
+    # ---- 3. Critical path: tail[i] = terms needed from i to the end of its longest chain ----
+    tail = [0] * n
+    nxt = [-1] * n
+    for i in reversed(order):
+        best, best_u = 0, -1
+        for u in succ[i]:
+            if tail[u] > best:
+                best, best_u = tail[u], u
+        tail[i] = best + 1
+        nxt[i] = best_u
+    critical: List[int] = []
+    if order:
+        i = min(order, key=lambda k: (-tail[k], k))
+        while i != -1:
+            critical.append(i)
+            i = nxt[i]
+    critical_set = set(critical)
+
+    # ---- 4. List scheduling into terms ----
+    # Course indices follow code order, so they break ties without decoding any codes
+    ready = [(-tail[i], i) for i in needed if indeg[i] == 0]
+    heapq.heapify(ready)
+    rows: List[Dict[str, Any]] = []
+    term = 0
+    total = 0
+    while ready:
+        term += 1
+        load = 0
+        taken: List[int] = []
+        deferred = []
+        while ready and len(deferred) < MAX_SKIPS_PER_TERM:
+            item = heapq.heappop(ready)
+            i = item[1]
+            c = max(0, graph.credits[i])
+            if load + c <= max_credits or not taken:  # an over-cap course still gets a term of its own
+                taken.append(i)
+                load += c
+                if load >= max_credits:
+                    break
+            else:
+                deferred.append(item)
+        for item in deferred:
+            heapq.heappush(ready, item)
+        taken.sort()
+        for i in taken:
+            rows.append({
+                "term": term,
+                "code": graph.codes[i],
+                "title": graph.titles[i],
+                "credits": graph.credits[i],
+                "requirement_type": req_type.get(i, "Prerequisite"),
+                "critical": i in critical_set,
+            })
+        total += load
+        for i in taken:
+            for u in succ[i]:
+                indeg[u] -= 1
+                if indeg[u] == 0:
+                    heapq.heappush(ready, (-tail[u], u))
+
+    return {
+        "program_id": program_id,
+        "rows": rows,
+        "required_courses": len(reqs),
+        "terms": term,
+        "total_credits": total,
+        "critical_path": [graph.codes[i] for i in critical],
+        "critical_path_terms": len(critical),
+        "max_credits": max_credits,
+        "electives": sorted(graph.codes[i] for i in electives),
+        "cycle": cycle,
+        "blocked": blocked,
+    }
+
+
+def _bench(n: int = 10_000, max_prereqs: int = 3, repeat: int = 5) -> None:
+    import random
+    import time
+
+    rnd = random.Random(42)
+    courses = [{"course_code": f"C{i:05d}", "title": f"Course {i}", "credits": rnd.choice([3, 3, 4])} for i in range(n)]
+    prereqs = []
+    for i in range(1, n):
+        # Prerequisites come from a window of earlier courses: a DAG with long chains
+        for p in rnd.sample(range(max(0, i - 50), i), min(i, rnd.randint(0, max_prereqs))):
+            prereqs.append({"course_code": f"C{i:05d}", "prereq_code": f"C{p:05d}"})
+    requires = [{"program_id": "BIG", "course_code": c["course_code"], "requirement_type": "Core"} for c in courses]
+    catalog = {"courses": courses, "programs": [], "prereqs": prereqs, "requires": requires}
+
+    start = time.perf_counter()
+    graph = CourseGraph.from_catalog(catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+    completed = [f"C{i:05d}" for i in range(0, n, 97)]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = schedule_program(graph, "BIG", completed, max_credits=15)
+        times.append((time.perf_counter() - start) * 1000)
+    print(f"courses={n} prereq_edges={len(prereqs)} graph_build={build_ms:.1f}ms")
+    print(f"schedule: best={min(times):.1f}ms median={sorted(times)[len(times) // 2]:.1f}ms "
+          f"terms={out['terms']} critical_path_terms={out['critical_path_terms']} rows={len(out['rows'])}")
+
+
+if __name__ == "__main__":
+    # python -m src.rag.scheduler [N]  -> scheduling benchmark on a synthetic N-course program
+    import sys
+
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
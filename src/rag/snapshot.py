@@ -0,0 +1,386 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.rag.catalog import Catalog
+
+# Layout (all integers native int32 unless noted, every section 8-byte aligned):
+#   header   MAGIC, format version, byte order, created_at, body crc32, body length,
+#            catalog fingerprint, then (offset, length) for each section
+#   strings  UTF-8 blob + offsets table; every text field is an index into it
+#   courses  [code, title, department, level, description, credits] per course
+#   programs [program_id, program_name, degree_type, department, description] per program
+#   CSR adjacency: prereqs/unlocks per course, requires (course, requirement type) per program
+MAGIC = b"ADVSNAP\x00"
+FORMAT_VERSION = 1
+DEFAULT_PATH = "data/catalog.snap"
+
+_BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+_FINGERPRINT_BYTES = 96
+SECTIONS = (
+    "string_blob", "string_offsets", "courses", "programs",
+    "prereq_offsets", "prereq_targets", "unlock_offsets", "unlock_targets",
+    "requires_offsets", "requires_courses", "requires_types",
+)
+_HEADER = struct.Struct(f"<8sIIQIQ{_FINGERPRINT_BYTES}s" + "QQ" * len(SECTIONS))
+COURSE_FIELDS = 6
+COURSE_COLUMNS = {"code": 0, "title": 1, "department": 2, "level": 3, "description": 4, "credits": 5}
+PROGRAM_FIELDS = 5
+CATALOG_TABLES = ("courses", "programs", "prereqs", "requires")
+NO_STRING = -1
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def build_csr(n: int, edges: List[tuple]) -> tuple:
+    """Compressed adjacency: neighbours of i are targets[offsets[i]:offsets[i + 1]]."""
+    counts = [0] * (n + 1)
+    for src, _ in edges:
+        counts[src + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    offsets = array("i", counts)
+    targets = array("i", [0] * len(edges))
+    fill = list(counts[:-1])
+    for src, dst in edges:
+        targets[fill[src]] = dst
+        fill[src] += 1
+    return offsets, targets
+
+
+def write_snapshot(path: str, catalog: Catalog, fingerprint: str = "") -> Dict[str, int]:
+    """Serialize a catalog (as returned by load_catalog) to `path`, atomically."""
+    strings: List[bytes] = []
+    string_ids: Dict[str, int] = {}
+
+    def sid(value: Any) -> int:
+        if value is None or value == "":
+            return NO_STRING
+        value = str(value)
+        i = string_ids.get(value)
+        if i is None:
+            i = string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return i
+
+    courses = sorted(catalog.get("courses", []), key=lambda c: c["course_code"])
+    course_idx = {c["course_code"]: i for i, c in enumerate(courses)}
+    programs = sorted(catalog.get("programs", []), key=lambda p: p["program_id"])
+    program_idx = {p["program_id"]: i for i, p in enumerate(programs)}
+
+    course_arr = array("i")
+    for c in courses:
+        try:
+            credits = int(c.get("credits") or 0)
+        except (TypeError, ValueError):
+            credits = 0
+        course_arr.extend([sid(c["course_code"]), sid(c.get("title")), sid(c.get("department")),
+                           sid(c.get("level")), sid(c.get("description")), credits])
+    program_arr = array("i")
+    for p in programs:
+        program_arr.extend([sid(p["program_id"]), sid(p.get("program_name")), sid(p.get("degree_type")),
+                            sid(p.get("department")), sid(p.get("description"))])
+
+    prereq_edges = []  # (course, prereq)
+    for r in catalog.get("prereqs", []):
+        c, pre = course_idx.get(r["course_code"]), course_idx.get(r["prereq_code"])
+        if c is not None and pre is not None:
+            prereq_edges.append((c, pre))
+    prereq_edges.sort()
+    prereq_offsets, prereq_targets = build_csr(len(courses), prereq_edges)
+    unlock_offsets, unlock_targets = build_csr(len(courses), sorted((pre, c) for c, pre in prereq_edges))
+
+    req_edges = []  # (program, course, type)
+    for r in catalog.get("requires", []):
+        p, c = program_idx.get(r["program_id"]), course_idx.get(r["course_code"])
+        if p is not None and c is not None:
+            req_edges.append((p, c, sid(r.get("requirement_type"))))
+    req_edges.sort()
+    requires_offsets, requires_courses = build_csr(len(programs), [(p, c) for p, c, _ in req_edges])
+    requires_types = array("i", [t for _, _, t in req_edges])
+
+    blob = b"".join(strings)
+    offs = [0]
+    for s in strings:
+        offs.append(offs[-1] + len(s))
+    string_offsets = array("i", offs)
+
+    sections = [blob, string_offsets.tobytes(), course_arr.tobytes(), program_arr.tobytes(),
+                prereq_offsets.tobytes(), prereq_targets.tobytes(), unlock_offsets.tobytes(),
+                unlock_targets.tobytes(), requires_offsets.tobytes(), requires_courses.tobytes(),
+                requires_types.tobytes()]
+    body = bytearray()
+    table = []
+    for data in sections:
+        body.extend(b"\x00" * (-len(body) % 8))
+        table.append((_HEADER.size + len(body), len(data)))
+        body.extend(data)
+
+    fp = fingerprint.encode("utf-8")
+    if len(fp) > _FINGERPRINT_BYTES:
+        raise SnapshotError("catalog fingerprint too long for snapshot header")
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _BYTE_ORDER, int(time.time()), zlib.crc32(body),
+                          len(body), fp, *[v for pair in table for v in pair])
+
+    # Write-then-rename so workers that already mapped the old file keep a consistent view
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp, path)
+    return {"courses": len(courses), "programs": len(programs), "prereqs": len(prereq_edges),
+            "requires": len(req_edges), "bytes": _HEADER.size + len(body)}
+
+
+class CatalogSnapshot:
+    """
+    Read-only, memory-mapped catalog snapshot written by `write_snapshot`.
+
+    The integer sections are exposed as memoryviews over the mapping, so every process
+    that opens the same file shares one physical copy through the page cache.
+    """
+
+    def __init__(self, path: str, verify_checksum: bool = True):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise SnapshotError(f"{path}: empty snapshot")
+        try:
+            self._validate(verify_checksum)
+        except Exception:
+            self.close()
+            raise
+
+    def _validate(self, verify_checksum: bool) -> None:
+        mm = self._mm
+        if len(mm) < _HEADER.size:
+            raise SnapshotError(f"{self.path}: truncated header")
+        fields = _HEADER.unpack_from(mm, 0)
+        magic, version, byte_order, created_at, crc, body_len, fp = fields[:7]
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path}: not a catalog snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{self.path}: format version {version}, expected {FORMAT_VERSION}")
+        if byte_order != _BYTE_ORDER:
+            raise SnapshotError(f"{self.path}: written on a machine with a different byte order")
+        if len(mm) != _HEADER.size + body_len:
+            raise SnapshotError(f"{self.path}: size mismatch (truncated or appended)")
+        body = memoryview(mm)[_HEADER.size:]
+        try:
+            if verify_checksum and zlib.crc32(body) != crc:
+                raise SnapshotError(f"{self.path}: checksum mismatch")
+        finally:
+            body.release()
+        self.created_at = created_at
+        self.fingerprint = fp.rstrip(b"\x00").decode("utf-8")
+
+        view = memoryview(mm)
+        self._views = [view]
+        self._sections: Dict[str, memoryview] = {}
+        table = fields[7:]
+        for i, name in enumerate(SECTIONS):
+            off, length = table[2 * i], table[2 * i + 1]
+            if off + length > len(mm):
+                raise SnapshotError(f"{self.path}: section {name} out of bounds")
+            sec = view[off:off + length]
+            self._sections[name] = sec if name == "string_blob" else sec.cast("i")
+        self.n_courses = len(self._sections["courses"]) // COURSE_FIELDS
+        self.n_programs = len(self._sections["programs"]) // PROGRAM_FIELDS
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_PATH, verify_checksum: bool = True) -> "CatalogSnapshot":
+        return cls(path, verify_checksum=verify_checksum)
+
+    def close(self) -> None:
+        for sec in getattr(self, "_sections", {}).values():
+            sec.release()
+        for v in getattr(self, "_views", []):
+            v.release()
+        self._sections = {}
+        self._views = []
+        if getattr(self, "_mm", None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a caller still holds an adjacency view; the mapping goes away with it
+            self._mm = None
+        self._file.close()
+
+    # ---- strings ----
+    def string(self, i: int) -> str:
+        if i == NO_STRING:
+            return ""
+        offs = self._sections["string_offsets"]
+        return bytes(self._sections["string_blob"][offs[i]:offs[i + 1]]).decode("utf-8")
+
+    # ---- courses ----
+    def _course_field(self, i: int, field: int) -> int:
+        return self._sections["courses"][i * COURSE_FIELDS + field]
+
+    def course_code(self, i: int) -> str:
+        return self.string(self._course_field(i, 0))
+
+    def course_title(self, i: int) -> str:
+        return self.string(self._course_field(i, 1))
+
+    def course_department(self, i: int) -> str:
+        return self.string(self._course_field(i, 2))
+
+    def course_credits(self, i: int) -> int:
+        return self._course_field(i, 5)
+
+    def course_column(self, name: str) -> Sequence:
+        """One course field (see COURSE_COLUMNS) as a read-only sequence over the mapping."""
+        ids = self._sections["courses"][COURSE_COLUMNS[name]::COURSE_FIELDS]
+        return ids if name == "credits" else StringColumn(self, ids)
+
+    def course_index(self, code: str) -> Optional[int]:
+        # write_snapshot stores courses sorted by code, so no per-process lookup table is needed
+        codes = self.course_column("code")
+        i = bisect_left(codes, code)
+        return i if i < len(codes) and codes[i] == code else None
+
+    def course(self, i: int) -> Dict[str, Any]:
+        base = i * COURSE_FIELDS
+        f = self._sections["courses"][base:base + COURSE_FIELDS]
+        return {"course_code": self.string(f[0]), "title": self.string(f[1]), "department": self.string(f[2]),
+                "level": self.string(f[3]), "credits": f[5], "description": self.string(f[4])}
+
+    # ---- adjacency (course indices) ----
+    def prereqs(self, i: int) -> memoryview:
+        offs = self._sections["prereq_offsets"]
+        return self._sections["prereq_targets"][offs[i]:offs[i + 1]]
+
+    def unlocks(self, i: int) -> memoryview:
+        offs = self._sections["unlock_offsets"]
+        return self._sections["unlock_targets"][offs[i]:offs[i + 1]]
+
+    def csr(self, name: str) -> tuple:
+        """Raw (offsets, targets) views: "prereq", "unlock" or "requires"."""
+        targets = "requires_courses" if name == "requires" else f"{name}_targets"
+        return self._sections[f"{name}_offsets"], self._sections[targets]
+
+    # ---- programs ----
+    def program_id(self, p: int) -> str:
+        return self.string(self._sections["programs"][p * PROGRAM_FIELDS])
+
+    def program_index(self, program_id: str) -> Optional[int]:
+        # Programs are sorted by id, like courses
+        lo, hi = 0, self.n_programs
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.program_id(mid) < program_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.n_programs and self.program_id(lo) == program_id else None
+
+    def program(self, p: int) -> Dict[str, Any]:
+        base = p * PROGRAM_FIELDS
+        f = self._sections["programs"][base:base + PROGRAM_FIELDS]
+        return {"program_id": self.string(f[0]), "program_name": self.string(f[1]),
+                "degree_type": self.string(f[2]), "department": self.string(f[3]),
+                "description": self.string(f[4])}
+
+    def program_requirements(self, p: int) -> List[tuple]:
+        """[(course index, requirement type)] for program index p."""
+        offs = self._sections["requires_offsets"]
+        lo, hi = offs[p], offs[p + 1]
+        courses = self._sections["requires_courses"]
+        types = self._sections["requires_types"]
+        return [(courses[k], self.string(types[k])) for k in range(lo, hi)]
+
+    # ---- rows (same shape as catalog.load_catalog) ----
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        """Decode one catalog table: "courses", "programs", "prereqs" or "requires"."""
+        if table == "courses":
+            return [self.course(i) for i in range(self.n_courses)]
+        if table == "programs":
+            return [self.program(p) for p in range(self.n_programs)]
+        if table == "prereqs":
+            return [{"course_code": self.course_code(i), "prereq_code": self.course_code(j)}
+                    for i in range(self.n_courses) for j in self.prereqs(i)]
+        if table == "requires":
+            return [{"program_id": self.program_id(p), "course_code": self.course_code(c), "requirement_type": typ}
+                    for p in range(self.n_programs) for c, typ in self.program_requirements(p)]
+        raise KeyError(table)
+
+    def to_catalog(self) -> Catalog:
+        """Materialize every table at once (for callers that need a plain dict)."""
+        return {table: self.rows(table) for table in CATALOG_TABLES}
+
+
+class StringColumn(Sequence):
+    """Strings named by a strided view of string ids, decoded per access; nothing is copied."""
+
+    def __init__(self, snap: CatalogSnapshot, ids: memoryview):
+        self._snap = snap
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._snap.string(k) for k in self._ids[i]]
+        return self._snap.string(self._ids[i])
+
+
+class ProgramRequirements(Mapping):
+    """program_id -> [(course index, requirement type)], looked up in the mapping per access."""
+
+    def __init__(self, snap: CatalogSnapshot):
+        self._snap = snap
+
+    def __getitem__(self, program_id: str) -> List[tuple]:
+        p = self._snap.program_index(program_id)
+        if p is None:
+            raise KeyError(program_id)
+        return self._snap.program_requirements(p)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._snap.program_id(p) for p in range(self._snap.n_programs))
+
+    def __len__(self) -> int:
+        return self._snap.n_programs
+
+
+class SnapshotCatalog(Mapping):
+    """
+    Catalog rows backed by a snapshot, decoded table by table the first time something
+    reads them. The course graph never does, so a worker that only plans keeps just the
+    mapping; the entity and topic indexes pull in the tables they iterate.
+    """
+
+    def __init__(self, snap: CatalogSnapshot):
+        self.snapshot = snap
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, table: str) -> List[Dict[str, Any]]:
+        if table not in CATALOG_TABLES:
+            raise KeyError(table)
+        with self._lock:
+            rows = self._rows.get(table)
+            if rows is None:
+                rows = self._rows[table] = self.snapshot.rows(table)
+            return rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CATALOG_TABLES)
+
+    def __len__(self) -> int:
+        return len(CATALOG_TABLES)
@@ -0,0 +1,166 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from src.rag.catalog import Catalog
+from src.rag.entity_index import QUESTION_STOPWORDS
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that phrase a topical question rather than name a topic
+QUERY_STOPWORDS = QUESTION_STOPWORDS | {
+    "any", "class", "classes", "cover", "covers", "covering", "deal", "deals", "focus", "focuses",
+    "learn", "offer", "offered", "subject", "teach", "teaches", "there", "topic", "topics", "where",
+}
+
+TITLE_BOOST = 2  # title terms count this many times in a course's term frequencies
+
+
+def tokenize(text: str) -> List[str]:
+    out = []
+    for t in _TOKEN_RE.findall((text or "").lower()):
+        if t in QUERY_STOPWORDS:
+            continue
+        # Light plural folding so "systems" matches "system"
+        if len(t) > 3 and t.endswith("s") and not t.endswith("ss"):
+            t = t[:-1]
+        out.append(t)
+    return out
+
+
+def _doc_terms(course: Dict[str, Any]) -> Counter:
+    tf = Counter(tokenize(course.get("description") or ""))
+    for t in tokenize(course.get("title") or ""):
+        tf[t] += TITLE_BOOST
+    return tf
+
+
+def _signature(course: Dict[str, Any]) -> tuple:
+    return (course.get("title"), course.get("description"), course.get("department"), course.get("level"))
+
+
+class TopicIndex:
+    """
+    BM25 inverted index over Course titles and descriptions.
+
+    Built from the catalog and updated in place when the catalog changes: only
+    added, removed or edited courses touch the postings.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self.docs: Dict[str, Dict[str, Any]] = {}  # code -> {"meta", "tf", "len", "sig"}
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {code: tf}
+        self.total_len = 0
+        self.program_courses: Dict[str, Dict[str, str]] = {}  # program_id -> {code: requirement_type}
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog, previous: Optional["TopicIndex"] = None) -> "TopicIndex":
+        idx = previous if previous is not None else cls()
+        idx.update(catalog)
+        return idx
+
+    def _remove(self, code: str) -> None:
+        doc = self.docs.pop(code)
+        self.total_len -= doc["len"]
+        for t in doc["tf"]:
+            posting = self.postings.get(t)
+            if posting is not None:
+                posting.pop(code, None)
+                if not posting:
+                    del self.postings[t]
+
+    def _add(self, course: Dict[str, Any]) -> None:
+        code = course["course_code"]
+        tf = _doc_terms(course)
+        length = sum(tf.values())
+        self.docs[code] = {
+            "meta": {
+                "code": code,
+                "title": course.get("title") or "",
+                "department": course.get("department") or "",
+                "level": course.get("level") or "",
+            },
+            "tf": tf,
+            "len": length,
+            "sig": _signature(course),
+        }
+        self.total_len += length
+        for t, n in tf.items():
+            self.postings.setdefault(t, {})[code] = n
+
+    def update(self, catalog: Catalog) -> Dict[str, int]:
+        """Apply catalog changes incrementally; returns counts of added/removed/changed courses."""
+        courses = {c["course_code"]: c for c in catalog.get("courses", []) if c.get("course_code")}
+        stats = {"added": 0, "removed": 0, "changed": 0}
+        with self._lock:
+            for code in [c for c in self.docs if c not in courses]:
+                self._remove(code)
+                stats["removed"] += 1
+            for code, course in courses.items():
+                doc = self.docs.get(code)
+                if doc is not None and doc["sig"] == _signature(course):
+                    continue
+                if doc is not None:
+                    self._remove(code)
+                    stats["changed"] += 1
+                else:
+                    stats["added"] += 1
+                self._add(course)
+
+            programs: Dict[str, Dict[str, str]] = {}
+            for r in catalog.get("requires", []):
+                programs.setdefault(r["program_id"], {})[r["course_code"]] = r.get("requirement_type") or ""
+            self.program_courses = programs
+        return stats
+
+    def search(
+        self,
+        query: str,
+        department: Optional[str] = None,
+        level: Optional[str] = None,
+        program_id: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Ranked rows like {"code","title","department","level","score"} (plus "requirement_type" with a program)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self.docs)
+            if n_docs == 0:
+                return []
+            avg_len = self.total_len / n_docs
+            allowed = self.program_courses.get(program_id, {}) if program_id else None
+
+            scores: Dict[str, float] = {}
+            for t in terms:
+                posting = self.postings.get(t)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for code, tf in posting.items():
+                    if allowed is not None and code not in allowed:
+                        continue
+                    dl = self.docs[code]["len"]
+                    denom = tf + self.k1 * (1.0 - self.b + self.b * dl / avg_len)
+                    scores[code] = scores.get(code, 0.0) + idf * tf * (self.k1 + 1.0) / denom
+
+            rows = []
+            for code, score in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0])):
+                meta = self.docs[code]["meta"]
+                if department and meta["department"].upper() != department.upper():
+                    continue
+                if level and meta["level"].upper() != level.upper():
+                    continue
+                row = dict(meta, score=round(score, 3))
+                if allowed is not None:
+                    row["requirement_type"] = allowed[code]
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+            return rows
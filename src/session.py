@@ -0,0 +1,250 @@
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.agents.cypher_agent import TEMPLATES
+from src.agents.planner import Plan, extract_entities
+from src.rag.entity_index import QUERY_WORDS, QUESTION_STOPWORDS, EntityIndex, normalize
+
+# Turns that name no course/program but point back at one ("and what does it unlock?")
+FOLLOW_UP_RE = re.compile(r"\b(it|its|it's|that|this|those|them|they|same)\b|^(and|also|what about|how about)\b", re.I)
+
+# Follow-up wording -> intent, tried in order against the focused course / program
+COURSE_FOLLOW_UPS: List[Tuple[str, re.Pattern]] = [
+    ("next_courses", re.compile(r"\bunlock|\blead(s)? to\b|\bopen(s)? up\b|\b(take|comes?) next\b|\bafter (it|that)\b", re.I)),
+    ("prereq_path", re.compile(r"\bshortest\b|\bpath\b|\bchain\b", re.I)),
+    ("direct_prereqs", re.compile(r"\b(direct|immediate)\b", re.I)),
+    ("all_prereqs", re.compile(r"\bpre-?req|\bneed before\b|\bbefore (i can take|taking)\b|\brequire", re.I)),
+    ("course_details", re.compile(r"\babout (it|that)\b|\bdescri|\bdetails?\b|\bcredits?\b|\bwhat is (it|that)\b", re.I)),
+]
+PROGRAM_FOLLOW_UPS: List[Tuple[str, re.Pattern]] = [
+    ("degree_plan", re.compile(r"\bplan\b|\bsemesters?\b|\bterms?\b|\bfinish\b|\bgraduate\b", re.I)),
+    ("program_requirements", re.compile(r"\brequire|\bcore\b|\belectives?\b|\bcourses? (in|for) (it|that)\b", re.I)),
+]
+# Everything a pure pointer follow-up may contain. Any other word ("that *machine learning*
+# class") may describe a different entity, so such questions still go to the planner.
+FOLLOW_UP_WORDS = QUESTION_STOPWORDS | QUERY_WORDS | {
+    "it", "its", "s", "that", "this", "those", "them", "they", "same", "one", "ones", "also", "how", "then",
+    "unlock", "lead", "leads", "open", "opens", "up", "next", "come", "comes", "shortest", "path", "chain",
+    "direct", "directly", "immediate", "pre", "req", "reqs", "require", "requires", "required", "taking",
+    "detail", "details", "describe", "description", "credit", "credits", "plan", "semester", "semesters",
+    "term", "terms", "finish", "graduate", "elective", "class", "list", "show", "give", "more", "all",
+    "full", "again", "please", "many", "much", "there", "will", "would", "should", "could", "have", "has", "be", "was",
+}
+
+COURSE_INTENTS = ("course_details", "direct_prereqs", "all_prereqs", "prereq_path", "next_courses", "eligibility_check")
+PROGRAM_INTENTS = ("program_requirements", "degree_plan")
+COMPLETED_INTENTS = ("eligibility_check", "eligible_courses", "degree_plan")
+
+
+def _rows_key(plan: Plan) -> Tuple[str, str]:
+    if plan.intent in PROGRAM_INTENTS:
+        return plan.intent, (plan.program_ids[0] if plan.program_ids else "")
+    return plan.intent, (plan.course_codes[0] if plan.course_codes else plan.target_course or "")
+
+
+class SessionContext:
+    """
+    What one conversation has established so far: the entities in focus and the rows
+    fetched for recent turns.
+
+    Follow-ups that only point back ("what does it unlock?") are planned from the focus
+    without a planner call, and answers that are a subset of earlier rows (direct prereqs
+    after all prereqs, a repeated question) come from those rows instead of Neo4j. At most
+    `max_turns` turns and `max_rows` rows are kept; the oldest turns are evicted first.
+    """
+
+    def __init__(self, max_turns: int = 5, max_rows: int = 2000):
+        self.max_turns = max(1, max_turns)
+        self.max_rows = max_rows
+        self.turns: Deque[Dict[str, Any]] = deque()
+        # remember() runs on the UI's worker thread while reruns read stats()
+        self._lock = threading.Lock()
+        self.course: Optional[str] = None
+        self.program: Optional[str] = None
+        self.completed: List[str] = []
+        self._last_kind = "course"
+        self.reused = 0
+
+    def focus(self) -> Tuple[Optional[str], Optional[str], Tuple[str, ...], str]:
+        # Everything plan_follow_up / fill_plan read, so equal focus means equal resolution
+        return self.course, self.program, tuple(self.completed), self._last_kind
+
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.turns)
+
+    def row_count(self) -> int:
+        return sum(len(t["rows"]) for t in self._snapshot())
+
+    def clear(self) -> None:
+        with self._lock:
+            self.turns.clear()
+        self.course = self.program = None
+        self.completed = []
+
+    # ---- planning ----
+
+    def _is_follow_up(self, question: str, index: Optional[EntityIndex]) -> bool:
+        courses, progs = extract_entities(question, index)
+        return not courses and not progs and bool(FOLLOW_UP_RE.search(question.strip()))
+
+    def plan_follow_up(self, question: str, index: Optional[EntityIndex] = None) -> Optional[Plan]:
+        """A Plan for a pure follow-up about the focused course/program, or None to ask the planner."""
+        if not (self.course or self.program) or not self._is_follow_up(question, index):
+            return None
+        if any(t not in FOLLOW_UP_WORDS for t in normalize(question).split()):
+            return None
+        kinds = ("course", "program") if self._last_kind == "course" else ("program", "course")
+        for kind in kinds:
+            focus = self.course if kind == "course" else self.program
+            rules = COURSE_FOLLOW_UPS if kind == "course" else PROGRAM_FOLLOW_UPS
+            if not focus:
+                continue
+            for intent, pattern in rules:
+                if not pattern.search(question):
+                    continue
+                return Plan(
+                    intent=intent,
+                    course_codes=[focus] if kind == "course" else [],
+                    program_ids=[focus] if kind == "program" else [],
+                    need_multihop=intent in ("all_prereqs", "prereq_path"),
+                    notes=f"Follow-up resolved from session context ({focus}).",
+                    target_course=focus if kind == "course" else None,
+                    completed_courses=list(self.completed) if intent in COMPLETED_INTENTS else [],
+                )
+        return None
+
+    def fill_plan(self, plan: Plan, question: str, index: Optional[EntityIndex] = None) -> Plan:
+        """Fill entities the planner left empty from the focus when the question points back at them."""
+        if plan.intent in COMPLETED_INTENTS and not plan.completed_courses and self.completed:
+            plan.completed_courses = list(self.completed)
+        if not self._is_follow_up(question, index):
+            return plan
+        if plan.intent in COURSE_INTENTS and not plan.course_codes and not plan.target_course and self.course:
+            plan.course_codes = [self.course]
+            plan.target_course = self.course
+        if plan.intent in PROGRAM_INTENTS and not plan.program_ids and self.program:
+            plan.program_ids = [self.program]
+        return plan
+
+    # ---- rows ----
+
+    def reuse_rows(self, plan: Plan) -> Optional[List[Dict[str, Any]]]:
+        """Rows for `plan` derived from an earlier turn, or None if they have to be fetched."""
+        intent, entity = _rows_key(plan)
+        if not entity:
+            return None
+        for turn in reversed(self._snapshot()):
+            if turn["key"] == (intent, entity):
+                return turn["rows"]
+            # all_prereqs rows carry hops, so the 1-hop prereqs are a filter away
+            if intent == "direct_prereqs" and turn["key"] == ("all_prereqs", entity):
+                # (unless the closure hit the template's LIMIT 500 and may be truncated)
+                if len(turn["rows"]) < 500 and all("hops" in r for r in turn["rows"]):
+                    return [{"code": r["code"], "title": r["title"]} for r in turn["rows"] if r["hops"] == 1]
+        return None
+
+    def remember(self, result: Dict[str, Any]) -> None:
+        plan: Plan = result["plan"]
+        course = plan.course_codes[0] if plan.course_codes else plan.target_course
+        program = plan.program_ids[0] if plan.program_ids else None
+        if course:
+            self.course = course
+            self._last_kind = "course"
+        if program:
+            self.program = program
+            if not course:
+                self._last_kind = "program"
+        if plan.completed_courses:
+            self.completed = list(plan.completed_courses)
+
+        # Only template rows have a known shape; LLM-written Cypher may return anything
+        template = TEMPLATES.get(plan.intent)
+        with self._lock:
+            if template is not None and result.get("cypher") == template["cypher"]:
+                self.turns.append({"question": result["question"], "key": _rows_key(plan), "rows": result["rows"]})
+            rows = sum(len(t["rows"]) for t in self.turns)
+            while self.turns and (len(self.turns) > self.max_turns or rows > self.max_rows):
+                rows -= len(self.turns.popleft()["rows"])
+
+    def stats(self) -> Dict[str, Any]:
+        turns = self._snapshot()
+        return {
+            "course": self.course,
+            "program": self.program,
+            "completed": list(self.completed),
+            "turns": len(turns),
+            "rows": sum(len(t["rows"]) for t in turns),
+            "reused": self.reused,
+        }
+
+
+class HistoryStore:
+    """
+    Bounded Q/A history for a UI session.
+
+    The newest `keep_full` entries keep their rows, Cypher and plan for the debug panel;
+    older ones are compacted to a summary (question, answer, intent, row count, verdict)
+    and anything past `max_entries` is dropped, so long sessions stay flat in memory.
+    """
+
+    def __init__(self, keep_full: int = 3, max_entries: int = 100):
+        self.keep_full = max(1, keep_full)
+        self.max_entries = max(self.keep_full, max_entries)
+        self.entries: Deque[Dict[str, Any]] = deque()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    def add(self, question: str, result: Dict[str, Any]) -> None:
+        plan: Plan = result["plan"]
+        self.entries.append({
+            "q": question,
+            "a": result["answer"],
+            "plan": plan.model_dump(),
+            "cypher": result["cypher"],
+            "params": result["params"],
+            "meta": result.get("meta") or {},
+            "rows": result["rows"],
+            "row_count": len(result["rows"]),
+            "verifier": result["verifier"],
+            "full": True,
+        })
+        if len(self.entries) > self.keep_full:
+            self._compact(self.entries[-self.keep_full - 1])
+        while len(self.entries) > self.max_entries:
+            self.entries.popleft()
+            self.dropped += 1
+
+    @staticmethod
+    def _compact(entry: Dict[str, Any]) -> None:
+        if not entry["full"]:
+            return
+        plan = entry["plan"]
+        entry["plan"] = {k: plan.get(k) for k in ("intent", "course_codes", "program_ids")}
+        entry["verifier"] = {"verdict": entry["verifier"].get("verdict")}
+        entry["cypher"] = ""
+        entry["params"] = {}
+        entry["meta"] = {}
+        entry["rows"] = []
+        entry["full"] = False
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        return self.entries[-1] if self.entries else None
+
+    def recent(self, n: int = 10) -> List[Dict[str, Any]]:
+        return list(self.entries)[-n:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "full": sum(1 for e in self.entries if e["full"]),
+            "rows_held": sum(len(e["rows"]) for e in self.entries),
+            "dropped": self.dropped,
+        }
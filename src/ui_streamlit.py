@@ -8,116 +8,189 @@ if str(PROJECT_ROOT) not in sys.path:
 
 
 
+import json
 import os
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 from dotenv import load_dotenv
 
+from src.agents.cypher_agent import TEMPLATES
+from src.concurrency import AdmissionRejected
 from src.db.neo4j_client import Neo4jClient
-from src.llm.ollama_client import OllamaClient
-from src.agents.planner import make_plan
-from src.agents.cypher_agent import build_cypher
-from src.agents.answer_agent import answer as answer_fn
-from src.agents.verifier import verify as verify_fn
-from src.rag.eligibility import check_eligibility
-from src.rag.formatters import extract_shortest_path, format_path_nodes
+from src.llm.router import ModelRouter
+from src.pipeline import pipeline_stats, run_pipeline
+from src.rag.catalog import CatalogCache
+from src.rag.snapshot import DEFAULT_PATH
+from src.session import HistoryStore, SessionContext
+from src.warmup import warm_up
 
 load_dotenv()
 
+# Template results depend only on the query, its params and the graph, so all sessions share them
+TEMPLATE_QUERIES = frozenset(t["cypher"] for t in TEMPLATES.values())
+ROWS_PREVIEW = 25
+
 @st.cache_resource
 def get_clients():
-    llm = OllamaClient(os.environ["OLLAMA_BASE_URL"], os.environ["OLLAMA_MODEL"])
+    router = ModelRouter.from_env()
     neo = Neo4jClient(os.environ["NEO4J_URI"], os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"])
-    return llm, neo
-
-def run_pipeline(llm, neo, question: str):
-    plan = make_plan(llm, question)
-
-    # Eligibility shortcut
-    if plan.intent == "eligibility_check" and plan.target_course:
-        eligible, missing = check_eligibility(neo, plan.target_course, plan.completed_courses)
-        if eligible:
-            ans = f"Yes — you appear eligible to take {plan.target_course}. (All prerequisites are satisfied.)"
-        else:
-            missing_str = ", ".join([m["code"] for m in missing]) if missing else "unknown prerequisites"
-            ans = f"Not yet — to take {plan.target_course}, you’re missing: {missing_str}."
-        return plan, [], "", {}, ans, {"verdict": "pass", "reason": "Eligibility computed from graph.", "followup_cypher_hint": ""}
-
-    hint = ""
-    last = {"plan": plan.model_dump(), "steps": []}
-    rows = []
-    ans = ""
-    cypher = ""
-    params = {}
-
-    for step in range(2):
-        cy = build_cypher(llm, plan, question, hint=hint)
-        cypher, params = cy.cypher, cy.params
-        rows = neo.run_read(cypher, params)
-
-        if plan.intent == "prereq_path":
-            path_nodes = extract_shortest_path(rows)
-            if path_nodes:
-                ans = f"Shortest prerequisite path:\n{format_path_nodes(path_nodes)}"
-            else:
-                ans = answer_fn(llm, plan, question, rows)
-        else:
-            ans = answer_fn(llm, plan, question, rows)
-
-        ver = verify_fn(llm, question, rows, ans)
-        last["steps"].append({"cypher": cypher, "params": params, "rows": rows, "answer": ans, "verifier": ver.model_dump()})
+    catalog = CatalogCache(neo, snapshot_path=os.environ.get("CATALOG_SNAPSHOT", DEFAULT_PATH))
+    # Runs once per server process (cache_resource), not once per session
+    startup = warm_up(router, neo, catalog)
+    return router, neo, catalog, startup
 
-        if ver.verdict == "pass":
-            break
-        if ver.verdict == "needs_more" and step == 0:
-            hint = ver.followup_cypher_hint or "Retrieve more relevant nodes/relationships."
-            continue
-        break
-
-    return plan, rows, cypher, params, ans, last["steps"][-1]["verifier"] if last["steps"] else {}
+@st.cache_resource
+def get_executor():
+    # Shared by all sessions; the router's admission queue still caps concurrent LLM calls
+    return ThreadPoolExecutor(max_workers=int(os.environ.get("UI_WORKERS", "4")), thread_name_prefix="advisor")
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def _template_rows(_neo, query: str, params_json: str, catalog_version: int):
+    return _neo.run_read(query, json.loads(params_json))
+
+class SharedReads:
+    """
+    Neo4jClient stand-in for the pipeline: template reads go through st.cache_data (keyed on
+    the catalog version, so a graph change invalidates them); every other read passes through.
+    """
+
+    def __init__(self, neo: Neo4jClient, catalog: CatalogCache):
+        self.neo = neo
+        self.catalog = catalog
+
+    def run_read(self, query, params=None):
+        if query not in TEMPLATE_QUERIES:
+            return self.neo.run_read(query, params)
+        self.catalog.get()  # re-checks the graph fingerprint once the TTL has expired
+        params_json = json.dumps(params or {}, sort_keys=True, default=str)
+        return _template_rows(self.neo, query, params_json, self.catalog.version)
+
+    def __getattr__(self, name):
+        return getattr(self.neo, name)
+
+def submit_question(router, reads, catalog, context, question: str):
+    stages = []  # appended by the worker thread, read by the polling fragment
+    future = get_executor().submit(
+        run_pipeline, router, reads, catalog, question,
+        session=context, on_stage=lambda name, data: stages.append((name, data)),
+    )
+    return {"question": question, "future": future, "stages": stages}
+
+def collect_job():
+    job = st.session_state.job
+    if job is None or not job["future"].done():
+        return
+    st.session_state.job = None
+    try:
+        result = job["future"].result()
+    except AdmissionRejected:
+        st.session_state.notice = "The advisor is busy right now (too many questions in flight). Please try again in a moment."
+    except Exception as e:
+        st.session_state.notice = f"Something went wrong while answering: {e}"
+    else:
+        st.session_state.history.add(job["question"], result)
+
+def _stage_line(name, data) -> str:
+    if name == "plan":
+        p = data["plan"]
+        entities = ", ".join(p["course_codes"] + p["program_ids"])
+        return f"Planned `{p['intent']}`" + (f" for {entities}" if entities else "")
+    if name == "cypher":
+        return f"Cypher ready (step {data['step']})"
+    if name == "rows":
+        if data.get("reused"):
+            return f"Reused {data['count']} rows from this conversation"
+        return f"Fetched {data['count']} rows"
+    if name == "answer":
+        return "Answer drafted"
+    if name == "verifier":
+        return f"Verifier: {data.get('verdict')}"
+    return name
+
+@st.fragment(run_every=0.5)
+def show_pending():
+    # Re-renders on its own every 0.5s while the worker runs; the rest of the page stays live
+    job = st.session_state.job
+    if job is None:
+        return
+    if job["future"].done():
+        st.rerun()
+    stages = list(job["stages"])
+    with st.status(f"Working on: {job['question']}", expanded=True):
+        for name, data in stages:
+            st.write(_stage_line(name, data))
+    answers = [data["answer"] for name, data in stages if name == "answer"]
+    if answers:
+        st.markdown(f"**Draft answer:** {answers[-1]}")
 
 def main():
     st.set_page_config(page_title="Agentic Neo4j Course Advisor", layout="wide")
     st.title("Agentic Neo4j Course & Program Advisor")
 
-    llm, neo = get_clients()
+    router, neo, catalog, startup = get_clients()
+    reads = SharedReads(neo, catalog)
 
     if "history" not in st.session_state:
-        st.session_state.history = []
+        st.session_state.history = HistoryStore()
+    if "context" not in st.session_state:
+        st.session_state.context = SessionContext()
+    if "job" not in st.session_state:
+        st.session_state.job = None
+    collect_job()
 
     col1, col2 = st.columns([2, 1])
 
     with col1:
         question = st.text_input("Ask a question", placeholder="e.g., What do I need before I can take DMS440?")
-        ask = st.button("Ask")
+        ask = st.button("Ask", disabled=st.session_state.job is not None)
 
         if ask and question.strip():
-            plan, rows, cypher, params, ans, verifier = run_pipeline(llm, neo, question.strip())
-            st.session_state.history.append({"q": question, "a": ans, "plan": plan.model_dump(), "cypher": cypher, "params": params, "rows": rows, "verifier": verifier})
+            st.session_state.job = submit_question(router, reads, catalog, st.session_state.context, question.strip())
+
+        if st.session_state.get("notice"):
+            st.warning(st.session_state.pop("notice"))
+        if st.session_state.job is not None:
+            show_pending()
+
+    history: HistoryStore = st.session_state.history
 
     with col1:
         st.subheader("Chat")
-        for item in reversed(st.session_state.history[-10:]):
+        for item in reversed(history.recent(10)):
             st.markdown(f"**Q:** {item['q']}")
             st.markdown(f"**A:** {item['a']}")
             st.divider()
 
     with col2:
         st.subheader("Debug")
-        if st.session_state.history:
-            last = st.session_state.history[-1]
+        last = history.last()
+        if last is not None:
             with st.expander("Plan", expanded=True):
                 st.json(last["plan"])
             with st.expander("Cypher", expanded=True):
-                st.code(last["cypher"] or "(eligibility shortcut / no cypher)", language="cypher")
+                st.code(last["cypher"] or "(deterministic shortcut / no cypher)", language="cypher")
                 st.json(last["params"])
+            if last["meta"]:
+                with st.expander("Schedule", expanded=True):
+                    st.json(last["meta"])
             with st.expander("Rows preview", expanded=False):
                 if last["rows"]:
-                    st.dataframe(pd.DataFrame(last["rows"]).head(25))
+                    import pandas as pd  # only needed once rows are shown
+
+                    # Only the preview slice is converted on each rerun
+                    st.dataframe(pd.DataFrame(last["rows"][:ROWS_PREVIEW]))
+                    if last["row_count"] > ROWS_PREVIEW:
+                        st.caption(f"Showing {ROWS_PREVIEW} of {last['row_count']} rows.")
                 else:
                     st.write("No rows.")
             with st.expander("Verifier", expanded=True):
                 st.json(last["verifier"])
+            with st.expander("Models", expanded=False):
+                st.json({**router.report(), "question_coalescing": pipeline_stats()})
+            with st.expander("Conversation context", expanded=False):
+                st.json({**st.session_state.context.stats(), "history": history.stats()})
+            with st.expander("Startup warm-up (seconds)", expanded=False):
+                st.json(startup)
         else:
             st.info("Ask a question to see planner, cypher, rows, and verifier output.")
 